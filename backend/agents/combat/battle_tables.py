@@ -0,0 +1,114 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, Optional
+import numpy as np
+from pyboy import PyBoy
+from config.logger_core import log_msg
+from backend.utils.ram_map import BattleMon, rom_checksum
+
+# Tabla de movimientos del ROM (banco 0x0E, 0x38000 en el archivo): 6 bytes por
+# movimiento (id, efecto, potencia, tipo, precisión, PP), empezando por DESTRUCTOR.
+MOVES_BANK, MOVES_ADDRESS = 0x0E, 0x4000
+MOVE_SIZE = 6
+NUM_MOVES = 165
+POUND = (0x01, 0x00, 0x28, 0x00, 0xFF, 0x23)
+
+# Tabla de tipos (banco 0x0F): tripletes (atacante, defensor, multiplicador x10)
+# terminados en 0xFF. Su posición cambia entre versiones, así que se busca por
+# sus dos primeras entradas: AGUA→FUEGO x2 y FUEGO→PLANTA x2.
+TYPE_CHART_BANK = 0x0F
+TYPE_CHART_SIGNATURE = bytes((0x15, 0x14, 20, 0x14, 0x16, 20))
+NUM_TYPES = 0x1B
+SPECIAL_TYPES_FROM = 0x14       # FUEGO en adelante usan Especial; el resto, Ataque/Defensa
+
+RANDOM_FACTOR = 236 / 255       # media del factor aleatorio de daño (217..255)/255
+
+
+@dataclass
+class BattleTables:
+    """
+    Datos de combate precalculados una vez por cartucho. `effectiveness`
+    guarda el multiplicador de cada movimiento contra cada combinación de
+    tipos del defensor, así que elegir movimiento solo indexa y multiplica.
+    """
+    power: np.ndarray           # float32 [NUM_MOVES + 1]; el índice es el id del movimiento
+    move_type: np.ndarray       # uint8
+    accuracy: np.ndarray        # float32, 0..1
+    max_pp: np.ndarray          # uint8
+    special: np.ndarray         # bool: el tipo del movimiento usa Especial
+    chart: np.ndarray           # float32 [NUM_TYPES, NUM_TYPES]
+    effectiveness: np.ndarray   # float32 [NUM_MOVES + 1, NUM_TYPES, NUM_TYPES]
+
+    @classmethod
+    def from_rom(cls, pyboy: PyBoy) -> Optional["BattleTables"]:
+        mem = pyboy.memory
+        raw = np.array(mem[MOVES_BANK, MOVES_ADDRESS:MOVES_ADDRESS + NUM_MOVES * MOVE_SIZE],
+                       dtype=np.uint8).reshape(NUM_MOVES, MOVE_SIZE)
+        if tuple(int(v) for v in raw[0]) != POUND:
+            log_msg("warning", "combat.move_table_not_found")
+            return None
+        # Fila 0 vacía para indexar directamente por id de movimiento
+        moves = np.vstack([np.zeros((1, MOVE_SIZE), dtype=np.uint8), raw])
+        move_type = np.minimum(moves[:, 3], NUM_TYPES - 1)
+
+        chart = np.ones((NUM_TYPES, NUM_TYPES), dtype=np.float32)
+        bank = bytes(mem[TYPE_CHART_BANK, 0x4000:0x7FFF])
+        start = bank.find(TYPE_CHART_SIGNATURE)
+        if start < 0:
+            log_msg("warning", "combat.type_chart_not_found")
+        else:
+            i = start
+            while bank[i] != 0xFF:
+                attacker, defender, mult = bank[i:i + 3]
+                if attacker < NUM_TYPES and defender < NUM_TYPES:
+                    chart[attacker, defender] = mult / 10.0
+                i += 3
+
+        per_type = chart[move_type]                             # [moves, tipo defensor]
+        effectiveness = per_type[:, :, None] * per_type[:, None, :]
+        # Un solo tipo (tipo1 == tipo2) cuenta una vez
+        diag = np.arange(NUM_TYPES)
+        effectiveness[:, diag, diag] = per_type
+
+        return cls(
+            power=moves[:, 2].astype(np.float32),
+            move_type=move_type,
+            accuracy=moves[:, 4].astype(np.float32) / 255.0,
+            max_pp=moves[:, 5].copy(),
+            special=move_type >= SPECIAL_TYPES_FROM,
+            chart=chart,
+            effectiveness=effectiveness,
+        )
+
+    def expected_damage(self, attacker: BattleMon, defender: BattleMon) -> np.ndarray:
+        """
+        Daño esperado de cada uno de los cuatro movimientos de `attacker`
+        (fórmula de la 1.ª generación con el factor aleatorio medio),
+        multiplicado por la precisión y limitado a los PS del rival; 0 para
+        huecos vacíos, movimientos sin PP o sin potencia.
+        """
+        moves = np.array(attacker.moves, dtype=np.intp)
+        moves[moves > NUM_MOVES] = 0
+        special = self.special[moves]
+        atk = np.where(special, attacker.special, attacker.attack).astype(np.float32)
+        dfn = np.maximum(np.where(special, defender.special, defender.defense), 1).astype(np.float32)
+        level = np.float32(2 * attacker.level // 5 + 2)
+        power = self.power[moves]
+        base = (level * power * atk / dfn) / 50.0 + 2.0
+        stab = np.where(np.isin(self.move_type[moves], attacker.types), 1.5, 1.0)
+        t1, t2 = (min(t, NUM_TYPES - 1) for t in defender.types)
+        damage = base * stab * self.effectiveness[moves, t1, t2] * RANDOM_FACTOR
+        expected = self.accuracy[moves] * np.minimum(damage, max(defender.hp, 1))
+        usable = (moves > 0) & (power > 0) & (np.array(attacker.pp) > 0)
+        return np.where(usable, expected, 0.0).astype(np.float32)
+
+
+_tables: Dict[int, Optional[BattleTables]] = {}
+
+
+def load_tables(pyboy: PyBoy) -> Optional[BattleTables]:
+    """BattleTables del cartucho cargado; se construyen la primera vez y se reutilizan."""
+    checksum = rom_checksum(pyboy)
+    if checksum not in _tables:
+        _tables[checksum] = BattleTables.from_rom(pyboy)
+    return _tables[checksum]
@@ -1,20 +1,47 @@
 import json
 import os
 import random
-from typing import Dict, Any, List
+import numpy as np
+from typing import Dict, Any, List, Optional
 from pyboy import PyBoy
 from config.logger_core import log_msg
+from backend.utils.ram_map import (CURSOR_TILE, RamSnapshot, TILEMAP, TILEMAP_COLS, TILEMAP_ROWS,
+                                   read_battle, read_menu, read_snapshot, tile_at)
+from backend.utils.profiler import phase_start, phase_end
+from backend.utils.joypad import InputScheduler, Joypad
+from backend.agents.combat.battle_tables import BattleTables, load_tables
+
+# Disposición de los menús de combate en pantalla (wTopMenuItemY/X)
+BATTLE_MENU_TOP = 14            # LUCHA / OBJ. | PkMn / ESC, dos filas entre elementos
+BATTLE_MENU_COLS = (9, 15)
+MOVE_MENU_TOP = 12              # lista de movimientos: el primero es el elemento 1
+MOVE_MENU_COL = 5
+TEXT_ROWS_FROM = 12             # filas inferiores, donde aparecen textos y menús
 
 
 class CombatAgent:    
-    def __init__(self, pyboy: PyBoy):
+    def __init__(self, pyboy: PyBoy, seed: Optional[int] = None,
+                 scheduler: Optional[InputScheduler] = None):
         self.pyboy = pyboy
+        self.rng = random.Random(seed)
+        self.scheduler = scheduler or InputScheduler(Joypad(pyboy))
+        self.joypad = self.scheduler.joypad
         self.actions_dict = self._load_actions_dict()
         self.combat_actions = self._get_combat_actions()
         self.battle_turn_counter = 0
         
         self.log_counter = 0
         self.log_frequency = 100
+        self.profiler = None
+        self.last_action: Optional[str] = None
+
+        self.tables: Optional[BattleTables] = load_tables(pyboy)
+        self.battles = 0
+        self.moves_used = 0
+        self.battle_frames = 0
+        self._battle_start: Optional[int] = None
+        self._battle_moves = 0
+        self._nudges = 0
         
     def _load_actions_dict(self) -> Dict[str, Any]:
         """Carga el diccionario de acciones compartidas."""
@@ -32,18 +59,17 @@ class CombatAgent:
         context_actions = self.actions_dict.get("contexts", {}).get("combat", {})
         return context_actions.get("primary_actions", ["a", "b"])
     
-    def read_battle_state(self) -> Dict[str, Any]:
-        """Lee el estado actual de la batalla desde RAM."""
+    def read_battle_state(self, snapshot: Optional[RamSnapshot] = None) -> Dict[str, Any]:
+        """Lee el estado actual de la batalla desde el snapshot del tick (o desde RAM)."""
         try:
-            player_hp = self.pyboy.memory[0xD015]
-            enemy_hp = self.pyboy.memory[0xCFE6]
-            turn_flag = self.pyboy.memory[0xCC3E]
+            if snapshot is None:
+                snapshot = read_snapshot(self.pyboy)
             
             return {
-                "player_hp": player_hp,
-                "enemy_hp": enemy_hp,
-                "turn_active": turn_flag > 0,
-                "battle_active": self.pyboy.memory[0xD057] > 0
+                "player_hp": snapshot.player_hp,
+                "enemy_hp": snapshot.enemy_hp,
+                "turn_active": snapshot.turn_flag > 0,
+                "battle_active": snapshot.battle_flag > 0
             }
         except Exception as e:
             if self.log_counter % (self.log_frequency * 10) == 0:
@@ -52,40 +78,94 @@ class CombatAgent:
     
     def choose_combat_action(self, battle_state: Dict[str, Any]) -> str:
         """
-        Elige la acción de combate basada en el estado actual.
-        Estrategia simple: atacar principalmente, ocasionalmente usar items.
+        Lleva el cursor directamente: en el menú principal va a LUCHA, en la
+        lista de movimientos al de más daño esperado según BattleTables, y
+        fuera de ellos pulsa A para pasar los textos (o B si hay otro menú
+        abierto, como el de cambiar de Pokémon).
         """
-        if not battle_state.get("turn_active", False):
-            return "a"
-        
-        if battle_state.get("player_hp", 100) < 30:
-            if random.random() < 0.3:
-                return "down"
-            else:
-                return "a"
-        else:
-            if random.random() < 0.9:
-                return "a"
-            else:
-                return "down"
-    
+        top_y, top_x, item = read_menu(self.pyboy)
+        if top_y == BATTLE_MENU_TOP and top_x in BATTLE_MENU_COLS:
+            if tile_at(self.pyboy, top_y + 2 * item, top_x) == CURSOR_TILE:
+                if top_x != BATTLE_MENU_COLS[0]:
+                    return self._nudge("left")
+                return self._nudge("up") if item != 0 else self._confirm()
+        elif top_y == MOVE_MENU_TOP and top_x == MOVE_MENU_COL:
+            if tile_at(self.pyboy, top_y + item, top_x) == CURSOR_TILE:
+                target = self.choose_move() + 1
+                if item != target:
+                    return self._nudge("down" if item < target else "up")
+                self.moves_used += 1
+                self._battle_moves += 1
+                return self._confirm()
+        elif self._cursor_visible():
+            return "b"
+        return "a"
+
+    def _nudge(self, direction: str) -> str:
+        # Si el cursor no responde, el menú ya no está activo: avanzar texto
+        self._nudges += 1
+        return direction if self._nudges <= 6 else self._confirm()
+
+    def _confirm(self) -> str:
+        self._nudges = 0
+        return "a"
+
+    def _cursor_visible(self) -> bool:
+        mem = self.pyboy.memory
+        start = TILEMAP + TEXT_ROWS_FROM * TILEMAP_COLS
+        return CURSOR_TILE in mem[start:TILEMAP + TILEMAP_ROWS * TILEMAP_COLS]
+
+    def choose_move(self) -> int:
+        """
+        Índice (0..3) del movimiento con más daño esperado. Si ninguno hace
+        daño (o no hay tablas), uno al azar de los que tienen PP.
+        """
+        try:
+            player, enemy = read_battle(self.pyboy)
+        except Exception as e:
+            if self.log_counter % (self.log_frequency * 10) == 0:
+                log_msg("error", "combat.state_read_error", error=str(e))
+            return 0
+        if self.tables is not None:
+            expected = self.tables.expected_damage(player, enemy)
+            if expected.max() > 0:
+                return int(np.argmax(expected))
+        usable = [i for i, (move, pp) in enumerate(zip(player.moves, player.pp)) if move and pp]
+        return self.rng.choice(usable) if usable else 0
+
+    def end_battle(self) -> None:
+        """Lo llama el coordinador al salir del contexto de combate."""
+        if self._battle_start is None:
+            return
+        frames = self.pyboy.frame_count - self._battle_start
+        self.battles += 1
+        self.battle_frames += frames
+        log_msg("info", "combat.battle_finished", battle=self.battles, frames=frames,
+               moves=self._battle_moves)
+        self._battle_start = None
+        self._battle_moves = 0
+
     def execute_action(self, action: str) -> None:
+        t_input = phase_start(self.profiler)
         try:
-            for btn in ["up", "down", "left", "right", "a", "b"]:
-                self.pyboy.button_release(btn)
-            self.pyboy.button_press(action)
-            
+            self.scheduler.act(action)
+
         except Exception as e:
             if self.log_counter % (self.log_frequency * 5) == 0:
                 log_msg("error", "combat.action_execution_error", action=action, error=str(e))
+        phase_end(self.profiler, "input", t_input)
     
-    def step(self) -> None:
-        battle_state = self.read_battle_state()
+    def step(self, snapshot: Optional[RamSnapshot] = None) -> None:
+        battle_state = self.read_battle_state(snapshot)
         
         if not battle_state.get("battle_active", False):
+            self.last_action = None
             return
+        if self._battle_start is None:
+            self._battle_start = self.pyboy.frame_count
         
         action = self.choose_combat_action(battle_state)
+        self.last_action = action
         
         self.execute_action(action)
         
@@ -102,5 +182,8 @@ class CombatAgent:
         current_state = self.read_battle_state()
         return {
             "battle_turns": self.battle_turn_counter,
+            "battles": self.battles,
+            "moves_used": self.moves_used,
+            "frames_per_battle": self.battle_frames / self.battles if self.battles else 0.0,
             "current_battle_state": current_state
         }
\ No newline at end of file
@@ -0,0 +1,113 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from pyboy import PyBoy
+from config.logger_core import log_msg
+from backend.utils.ram_map import RAM_MAP, rom_checksum, translate
+
+# `ld [a16], a`: la forma en que el juego escribe wIsInBattle y wCurrentMenuItem
+LD_A16_A = 0xEA
+ROM_SIZE_ADDRESS = 0x0148
+
+CONTEXT_FIELDS: Tuple[str, ...] = ("battle_flag", "menu_flag")
+
+
+def _rom_banks(pyboy: PyBoy) -> int:
+    return 2 << pyboy.memory[ROM_SIZE_ADDRESS]
+
+
+def _read_bank(mem, bank: int) -> bytes:
+    # PyBoy no acepta cortes de banco que acaben en 0x8000: el último byte va aparte
+    return bytes(mem[bank, 0x4000:0x7FFF]) + bytes((mem[bank, 0x7FFF],))
+
+
+_writers: Dict[Tuple[int, int], Tuple[Tuple[int, int], ...]] = {}
+
+
+def find_writers(pyboy: PyBoy, address: int) -> Tuple[Tuple[int, int], ...]:
+    """
+    (banco, dirección) de cada instrucción `ld [address], a` del ROM. Se busca
+    una vez por cartucho; escrituras indirectas (`ld [hl], a`) no aparecen, de
+    eso se encarga el sondeo.
+    """
+    key = (rom_checksum(pyboy), address)
+    if key in _writers:
+        return _writers[key]
+    mem = pyboy.memory
+    pattern = bytes((LD_A16_A, address & 0xFF, address >> 8))
+    found: List[Tuple[int, int]] = []
+    for bank in range(_rom_banks(pyboy)):
+        base = 0x0000 if bank == 0 else 0x4000
+        data = bytes(mem[0x0000:0x4000]) if bank == 0 else _read_bank(mem, bank)
+        i = data.find(pattern)
+        while i >= 0:
+            found.append((bank, base + i))
+            i = data.find(pattern, i + 1)
+    _writers[key] = tuple(found)
+    return _writers[key]
+
+
+@dataclass
+class SwitchConfig:
+    confirm_frames: int = 3     # frames que el nuevo contexto debe mantenerse antes de cambiar
+    poll_interval: int = 30     # con hooks, cada cuántos frames se lee igualmente la RAM
+    hooks: bool = True
+
+
+class ContextWatcher:
+    """
+    Avisa de cuándo puede haber cambiado el contexto, para no leer la RAM en
+    cada tick.
+
+    Registra hooks de ejecución de PyBoy en las instrucciones que escriben
+    los campos de CONTEXT_FIELDS; al ejecutarse alguna, `dirty` pasa a True y
+    se guarda el frame (`event_frame`). Si no hay hooks (no se encuentran o
+    PyBoy no deja registrarlos), el coordinador sondea en cada tick.
+    """
+
+    def __init__(self, pyboy: PyBoy, use_hooks: bool = True):
+        self.pyboy = pyboy
+        checksum = rom_checksum(pyboy)
+        self.addresses = tuple(translate(checksum, RAM_MAP[name].address) for name in CONTEXT_FIELDS)
+        self.dirty = True
+        self.event_frame: Optional[int] = None
+        self.events = 0
+        self._hooks: List[Tuple[int, int]] = []
+        if use_hooks:
+            self._install()
+
+    @property
+    def hooked(self) -> bool:
+        return bool(self._hooks)
+
+    def _install(self) -> None:
+        for address in self.addresses:
+            for bank, addr in find_writers(self.pyboy, address):
+                try:
+                    self.pyboy.hook_register(bank, addr, self._on_write, None)
+                except Exception as e:
+                    log_msg("warning", "coordinator.hook_error", bank=bank, address=hex(addr), error=str(e))
+                    continue
+                self._hooks.append((bank, addr))
+        log_msg("info", "coordinator.hooks_installed", hooks=len(self._hooks))
+
+    def _on_write(self, _context) -> None:
+        # Se llama antes de la escritura: el valor nuevo se lee en el siguiente tick
+        self.events += 1
+        if not self.dirty:
+            self.dirty = True
+            self.event_frame = self.pyboy.frame_count
+
+    def read(self) -> Tuple[int, ...]:
+        """Valores actuales de CONTEXT_FIELDS; limpia `dirty`."""
+        self.dirty = False
+        mem = self.pyboy.memory
+        return tuple(mem[a] for a in self.addresses)
+
+    def close(self) -> None:
+        for bank, addr in self._hooks:
+            try:
+                self.pyboy.hook_deregister(bank, addr)
+            except Exception:
+                pass
+        self._hooks = []
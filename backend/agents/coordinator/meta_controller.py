@@ -4,6 +4,10 @@ from typing import Dict, Any, Optional
 from enum import Enum
 from pyboy import PyBoy
 from config.logger_core import log_msg
+from backend.utils.ram_map import RamSnapshot, read_snapshot
+from backend.utils.profiler import TickProfiler, phase_start, phase_end
+from backend.utils.joypad import InputScheduler
+from backend.agents.coordinator.context_watcher import ContextWatcher, SwitchConfig
 
 
 class GameContext(Enum):
@@ -13,15 +17,39 @@ class GameContext(Enum):
     UNKNOWN = "unknown"
 
 
+_AGENT_PHASES = {
+    GameContext.EXPLORATION: "agent.explorer",
+    GameContext.COMBAT: "agent.combat",
+}
+
+
 class MetaController:
-    def __init__(self, pyboy: PyBoy):
+    def __init__(self, pyboy: PyBoy, profiler: Optional[TickProfiler] = None,
+                 switch: Optional[SwitchConfig] = None):
         self.pyboy = pyboy
+        self.profiler = profiler
         self.actions_dict = self._load_actions_dict()
         self.current_context = GameContext.EXPLORATION
         self.context_history = []
+        self.switch_count = 0
+        self.context_counts: Dict[str, int] = {}
+        self.last_snapshot: Optional[RamSnapshot] = None
+        self.last_action: Optional[str] = None
+
+        self.switch = switch or SwitchConfig()
+        self.watcher = ContextWatcher(pyboy, use_hooks=self.switch.hooks)
+        # Sin hooks no hay aviso de escritura: se sondea en cada tick
+        self._poll_interval = self.switch.poll_interval if self.watcher.hooked else 1
+        self._next_poll = 0
+        # Histéresis: contexto candidato y frame en que se vio por primera vez
+        self._candidate: Optional[GameContext] = None
+        self._candidate_since = 0
+        self.last_switch_latency = 0
+        self.switch_latency_total = 0
         
         self.explorer_agent = None
         self.combat_agent = None
+        self.scheduler: Optional[InputScheduler] = None
         
     def _load_actions_dict(self) -> Dict[str, Any]:
         actions_path = os.path.join("src", "json", "actions.json")
@@ -32,34 +60,85 @@ class MetaController:
             log_msg("error", "config.file_not_found", file=actions_path)
             return {}
     
-    def register_agents(self, explorer_agent, combat_agent):
+    def register_agents(self, explorer_agent, combat_agent,
+                        scheduler: Optional[InputScheduler] = None):
         self.explorer_agent = explorer_agent
         self.combat_agent = combat_agent
+        # Con scheduler, el agente activo solo decide cuando termina su acción
+        self.scheduler = scheduler
+        for agent in (explorer_agent, combat_agent):
+            if agent is not None:
+                agent.profiler = self.profiler
         log_msg("info", "coordinator.agents_registered")
     
-    def detect_game_context(self) -> GameContext:
+    @staticmethod
+    def _classify(battle_flag: int, menu_flag: int) -> GameContext:
+        if battle_flag > 0:
+            return GameContext.COMBAT
+        elif menu_flag > 0:
+            return GameContext.MENU
+        return GameContext.EXPLORATION
+
+    def detect_game_context(self, snapshot: Optional[RamSnapshot] = None) -> GameContext:
         try:
-            battle_flag = self.pyboy.memory[0xD057]
-            menu_flag = self.pyboy.memory[0xCC26]
-            
-            if battle_flag > 0:
-                return GameContext.COMBAT
-            elif menu_flag > 0:
-                return GameContext.MENU
-            else:
-                return GameContext.EXPLORATION
-                
+            if snapshot is None:
+                return self._classify(*self.watcher.read())
+            return self._classify(snapshot.battle_flag, snapshot.menu_flag)
         except Exception as e:
             log_msg("error", "coordinator.context_detection_error", error=str(e))
             return GameContext.UNKNOWN
     
-    def should_switch_context(self, new_context: GameContext) -> bool:
-        if new_context != self.current_context:
-            if len(self.context_history) > 0:
-                if self.context_history[-1] == new_context:
-                    return False
-            return True
-        return False
+    def should_switch_context(self, new_context: GameContext, frame: Optional[int] = None) -> bool:
+        """
+        Histéresis: `new_context` tiene que mantenerse `confirm_frames` frames
+        seguidos antes de cambiar. Volver a un contexto reciente está
+        permitido (salir del menú a la exploración, por ejemplo).
+        """
+        if frame is None:
+            frame = self.pyboy.frame_count
+        if new_context == self.current_context or new_context == GameContext.UNKNOWN:
+            self._candidate = None
+            return False
+        if new_context != self._candidate:
+            self._candidate = new_context
+            self._candidate_since = frame
+        return frame - self._candidate_since >= self.switch.confirm_frames
+
+    def _switch_to(self, new_context: GameContext, frame: int) -> None:
+        previous_context = self.current_context
+        self.current_context = new_context
+        self.context_history.append(previous_context)
+        self.switch_count += 1
+        self.context_counts[new_context.value] = self.context_counts.get(new_context.value, 0) + 1
+        if len(self.context_history) > 10:
+            self.context_history.pop(0)
+        # Latencia desde que la RAM cambió (o se vio cambiar) hasta el cambio de agente
+        latency = frame - self._candidate_since
+        self.last_switch_latency = latency
+        self.switch_latency_total += latency
+        self._candidate = None
+
+        log_msg("info", "coordinator.context_switched",
+               from_context=previous_context.value,
+               to_context=new_context.value, latency=latency)
+        if previous_context == GameContext.COMBAT and self.combat_agent is not None:
+            self.combat_agent.end_battle()
+        if self.scheduler is not None:
+            # La acción en curso era del agente anterior
+            self.scheduler.cancel()
+
+    def _update_context(self, frame: int) -> None:
+        watcher = self.watcher
+        if not (watcher.dirty or self._candidate is not None or frame >= self._next_poll):
+            return
+        self._next_poll = frame + self._poll_interval
+        event_frame, watcher.event_frame = watcher.event_frame, None
+        detected = self.detect_game_context()
+        if event_frame is not None and detected not in (self.current_context, self._candidate):
+            # El hook dice en qué frame se escribió el valor
+            self._candidate, self._candidate_since = detected, event_frame
+        if self.should_switch_context(detected, frame):
+            self._switch_to(detected, frame)
     
     def get_active_agent(self):
         if self.current_context == GameContext.EXPLORATION:
@@ -70,23 +149,28 @@ class MetaController:
             return self.explorer_agent
     
     def step(self) -> str:
-        detected_context = self.detect_game_context()
-        
-        if self.should_switch_context(detected_context):
-            previous_context = self.current_context
-            self.current_context = detected_context
-            self.context_history.append(previous_context)
-            
-            if len(self.context_history) > 10:
-                self.context_history.pop(0)
-                
-            log_msg("info", "coordinator.context_switched", 
-                   from_context=previous_context.value, 
-                   to_context=detected_context.value)
+        prof = self.profiler
+        t0 = phase_start(prof)
+        # Solo se mira la RAM si un hook avisó, hay un cambio pendiente de confirmar o toca sondear
+        self._update_context(self.pyboy.frame_count)
+        phase_end(prof, "context", t0)
+
+        if self.scheduler is not None and not self.scheduler.ready():
+            return "Input busy"
+
+        try:
+            snapshot = read_snapshot(self.pyboy)
+        except Exception as e:
+            log_msg("error", "coordinator.context_detection_error", error=str(e))
+            snapshot = None
+        self.last_snapshot = snapshot
         
         active_agent = self.get_active_agent()
         if active_agent:
-            active_agent.step()
+            t1 = phase_start(prof)
+            active_agent.step(snapshot)
+            self.last_action = active_agent.last_action
+            phase_end(prof, _AGENT_PHASES.get(self.current_context, "agent.explorer"), t1)
             return f"Agent: {active_agent.__class__.__name__}, Context: {self.current_context.value}"
         else:
             log_msg("error", "coordinator.no_active_agent")
@@ -97,3 +181,16 @@ class MetaController:
     
     def get_current_context(self) -> GameContext:
         return self.current_context
+
+    def get_switch_stats(self) -> Dict[str, Any]:
+        return {
+            "switches": self.switch_count,
+            "hooks": self.watcher.hooked,
+            "hook_events": self.watcher.events,
+            "last_latency": self.last_switch_latency,
+            "mean_latency": self.switch_latency_total / self.switch_count if self.switch_count else 0.0,
+        }
+
+    def close(self) -> None:
+        """Quita los hooks del PyBoy (antes de crear otro coordinador sobre él)."""
+        self.watcher.close()
@@ -6,10 +6,35 @@ from typing import Dict, Tuple, Any, Optional
 from pyboy import PyBoy
 from config.logger_core import log_msg
 from backend.utils.noise_map import NoiseVisitMap, NoiseConfig
+from backend.utils.world_map import WorldVisitMap
+from backend.utils.visit_stats import VisitCounter
+from backend.utils.ram_map import FACING, RamSnapshot, read_snapshot
+from backend.utils.profiler import phase_start, phase_end
+from backend.utils.joypad import DIRECTIONS, InputScheduler, Joypad
+from backend.utils.observation import ObservationEncoder
+from backend.utils.novelty import NoveltyCache, screen_key
+from backend.agents.explorer.planner import FrontierPlanner, MOVES
+from backend.agents.explorer.q_learning import QConfig, QLearner, QL_ALGORITHMS, state_key
+
+EXPLORER_MODES = ("random", "frontier") + QL_ALGORITHMS
+
 
 class ExplorerAgent:
-    def __init__(self, pyboy: PyBoy):
+    # Decisiones pulsando botones al azar cuando las cuatro direcciones parecen bloqueadas
+    wander_steps = 4
+    # Decisiones pulsando solo botones (no direcciones) ante un texto, menú o escena
+    dismiss_steps = 2
+
+    def __init__(self, pyboy: PyBoy, seed: Optional[int] = None,
+                 scheduler: Optional[InputScheduler] = None, mode: str = "random"):
         self.pyboy = pyboy
+        if mode not in EXPLORER_MODES:
+            log_msg("warning", "explorer.unknown_mode", mode=mode, modes=", ".join(EXPLORER_MODES))
+            mode = "random"
+        self.mode = mode
+        self.rng = random.Random(seed)
+        self.scheduler = scheduler or InputScheduler(Joypad(pyboy))
+        self.joypad = self.scheduler.joypad
         path = os.path.join("src", "json", "actions.json")
         try:
             with open(path, encoding="utf-8") as f:
@@ -19,22 +44,44 @@ class ExplorerAgent:
             log_msg("error", "explorer.actions_not_found", file=path)
             self.actions = ["up","down","left","right"]
 
-        self.visits: Dict[Tuple[int,int],int] = {}
+        self.visits = VisitCounter()
         self.stuck = 0
         self.last_pos = (0, 0)
         self.logs = 0
         self.log_freq = 500
 
         self.noise = NoiseVisitMap(NoiseConfig(rows=15, cols=20, decay=0.997))
+        self.world = WorldVisitMap()
         self._stay_ticks = 0
+        # Vista de casillas de la pantalla; solo se calcula si alguien la pide
+        self.observation = ObservationEncoder(pyboy)
+        # Pantallas vistas al decidir: novedad y ciclos
+        self.novelty = NoveltyCache()
+        self._screen = 0
+        self.loops = 0
+        self.ignored_inputs = 0
+
+        # Casilla del mundo sobre la que está centrado `noise`
+        self._anchor_map: Optional[int] = None
+        self._anchor = (0, 0)
+        self.profiler = None
+        self.last_action: Optional[str] = None
 
-        self._world_offset = (0, 0)
+        self.planner = FrontierPlanner(self.world, seed=seed) if mode == "frontier" else None
+        self.learner = (QLearner(self.actions, QConfig(algorithm=mode), seed=seed)
+                        if mode in QL_ALGORITHMS else None)
+        # (map_id, posición) al decidir la acción anterior
+        self._prev_key: Optional[Tuple[int, Tuple[int, int]]] = None
+        self._blocked_here = 0
+        self._wander = 0
+        self._dismiss = 0
+        self._buttons = [a for a in self.actions if a not in DIRECTIONS] or ["a"]
 
-    def read_position(self) -> Tuple[int,int]:
+    def read_position(self, snapshot: Optional[RamSnapshot] = None) -> Tuple[int,int]:
         try:
-            x = self.pyboy.memory[0xD362]
-            y = self.pyboy.memory[0xD361]
-            return (x, y)
+            if snapshot is None:
+                snapshot = read_snapshot(self.pyboy)
+            return snapshot.position
         except Exception:
             return self.last_pos
 
@@ -44,17 +91,137 @@ class ExplorerAgent:
         else:
             self.stuck = 0
             
+        recovery = self._recovery_action()
+        if recovery is not None:
+            return recovery
         if self.stuck > 20:
-            return random.choice(self.actions)
+            return self.rng.choice(self.actions)
+
+        return self.rng.choice(self.actions) if self.rng.random() < 0.85 else "a"
+
+    def _recovery_action(self) -> Optional[str]:
+        if self._dismiss > 0:
+            self._dismiss -= 1
+            return self.rng.choice(self._buttons)
+        if self._wander > 0:
+            self._wander -= 1
+            return self.rng.choice(self.actions)
+        return None
 
-        return random.choice(self.actions) if random.random() < 0.85 else "a"
+    def _choose_frontier(self, map_id: int, pos: Tuple[int, int]) -> str:
+        recovery = self._recovery_action()
+        if recovery is not None:
+            return recovery
+        action = self.planner.next_action(map_id, pos)
+        return action if action is not None else self.rng.choice(self.actions)
+
+    def _choose_learned(self, map_id: int, pos: Tuple[int, int], facing: int) -> str:
+        """
+        Recompensa de la decisión anterior: coste por paso y, si se llegó a
+        otra casilla, su novedad según `noise` (poco pisada = más recompensa;
+        el decaimiento hace que lo visitado hace tiempo vuelva a valer).
+        """
+        cfg = self.learner.cfg
+        reward = -cfg.step_cost + cfg.screen_weight * self.novelty.novelty(self._screen)
+        if self._prev_key is not None and self._prev_key != (map_id, pos):
+            center = self.noise.value_at(self.noise.cfg.rows // 2, self.noise.cfg.cols // 2)
+            reward += cfg.novelty_weight / (1.0 + center)
+        return self.learner.act(state_key(map_id, pos[0], pos[1], facing), reward)
+
+    def _observe_screen(self) -> None:
+        """
+        Anota la pantalla actual en `novelty`. Si las últimas decisiones
+        forman un ciclo se reacciona ya: con la misma pantalla una y otra vez
+        se pulsan botones (a/b) para pasar el texto o cerrar el menú; si va y
+        vuelve entre casillas, se descarta el camino planificado y se pulsan
+        acciones al azar unas cuantas decisiones.
+        """
+        self._screen = screen_key(self.observation.tiles())
+        self.novelty.observe(self._screen)
+        period = self.novelty.loop_period()
+        if not period:
+            return
+        self.loops += 1
+        self.novelty.reset_history()
+        log_msg("debug", "explorer.loop_detected", period=period, position=self.last_pos)
+        if self.learner is not None:
+            return
+        if period == 1:
+            self._dismiss = self.dismiss_steps
+        else:
+            self._wander = self.wander_steps
+            if self.planner is not None:
+                self.planner.invalidate()
+
+    def _observe_result(self, map_id: int, pos: Tuple[int, int], facing: Optional[int] = None) -> None:
+        """
+        Resultado de la acción anterior, que ya terminó (el InputScheduler solo
+        pide decisión entonces): si era una dirección y no cambió la casilla,
+        el destino está bloqueado, siempre que el jugador sí se girara hacia
+        ella. Si ni siquiera se giró, la pulsación fue a un texto, un menú o
+        una escena: no se marca nada y se pulsan a/b un par de decisiones.
+        Con las cuatro direcciones bloqueadas a la vez pasa lo
+        mismo (por si `facing` no lo distingue): se deshacen esas marcas.
+        """
+        prev, self._prev_key = self._prev_key, (map_id, pos)
+        action = self.last_action
+        if action == "a":
+            self._observe_interaction(map_id, pos)
+        if prev is None or action not in DIRECTIONS:
+            return
+        if prev != (map_id, pos):
+            self.last_pos = pos
+            self._stay_ticks = 0
+            self._blocked_here = 0
+            log_msg("debug", "explorer.moved", from_pos=prev[1], to_pos=pos, action=action,
+                   grid_pos=self.world_to_local_grid(pos))
+            return
+
+        self._stay_ticks += 1
+        if facing is not None and facing != FACING[action]:
+            self.ignored_inputs += 1
+            self._dismiss = self.dismiss_steps
+            log_msg("debug", "explorer.input_ignored", direction=action, position=pos)
+            return
+        _, dx, dy = next(m for m in MOVES if m[0] == action)
+        target = (pos[0] + dx, pos[1] + dy)
+        if not self.world.is_blocked(map_id, target[0], target[1]):
+            self._mark_blocked(map_id, target, True)
+            self._blocked_here += 1
+            log_msg("debug", "explorer.blocked", direction=action, ticks=self._stay_ticks,
+                   blocked_cell=self.world_to_local_grid(target))
+        if self._blocked_here >= len(MOVES):
+            for _, dx, dy in MOVES:
+                self._mark_blocked(map_id, (pos[0] + dx, pos[1] + dy), False)
+            self._blocked_here = 0
+            self._wander = self.wander_steps
+            log_msg("debug", "explorer.frontier_wander", position=pos)
+
+    def _observe_interaction(self, map_id: int, pos: Tuple[int, int]) -> None:
+        if not self._detect_interaction():
+            return
+        center_r = self.noise.cfg.rows // 2
+        center_c = self.noise.cfg.cols // 2
+        self.noise.add_interact(center_r, center_c)
+
+        interest_kind = self._detect_interest_kind()
+        if interest_kind:
+            self.noise.set_interest(center_r, center_c, interest_kind)
+            code = int(self.noise.interest_layer[center_r, center_c])
+            if code:
+                self.world.set_interest(map_id, pos[0], pos[1], code)
+
+    def _mark_blocked(self, map_id: int, target: Tuple[int, int], flag: bool) -> None:
+        self.world.mark_blocked(map_id, target[0], target[1], flag)
+        r, c = self.world_to_local_grid(target)
+        self.noise.mark_blocked(r, c, flag)
 
     def world_to_local_grid(self, world_pos: Tuple[int,int]) -> Tuple[int,int]:
         wx, wy = world_pos
         center_r = self.noise.cfg.rows // 2
         center_c = self.noise.cfg.cols // 2
         
-        current_x, current_y = self.last_pos if hasattr(self, 'last_pos') else (0, 0)
+        current_x, current_y = self._anchor
         
         rel_x = wx - current_x
         rel_y = wy - current_y
@@ -64,85 +231,77 @@ class ExplorerAgent:
         
         return (local_r, local_c)
 
+    def _track_position(self, map_id: int, pos: Tuple[int,int]) -> None:
+        """
+        Registra la llegada a una casilla nueva en el mapa del mundo y mantiene
+        `noise` centrado en el jugador desplazando su contenido, para que el
+        historial local no se pierda al moverse.
+        """
+        if map_id == self._anchor_map and pos == self._anchor:
+            return
+        dx, dy = pos[0] - self._anchor[0], pos[1] - self._anchor[1]
+        rows, cols = self.noise.cfg.rows, self.noise.cfg.cols
+        if map_id != self._anchor_map or abs(dy) >= rows // 2 or abs(dx) >= cols // 2:
+            # Cambio de mapa o salto: reconstruir la ventana desde el historial del mundo
+            visits, blocked, interest = self.world.window(map_id, pos, rows, cols)
+            self.noise.load_window(visits * self.noise.cfg.weights.visit_inc, blocked, interest)
+        else:
+            self.noise.shift(-dy, -dx)
+        self._anchor_map = map_id
+        self._anchor = pos
+
+        self.world.add_visit(map_id, pos[0], pos[1])
+        center_r, center_c = rows // 2, cols // 2
+        self.noise.mark_blocked(center_r, center_c, False)
+        self.noise.add_visit(center_r, center_c)
+
     def _detect_interaction(self) -> bool:
         return False
 
     def _detect_interest_kind(self) -> Optional[str]:
         return None
 
-    def step(self):
-        pos_before = self.read_position()
-
-        action = self.choose_action(pos_before)
+    def step(self, snapshot: Optional[RamSnapshot] = None):
+        if snapshot is None:
+            snapshot = read_snapshot(self.pyboy)
+        map_id = snapshot.map_id
+        pos = self.read_position(snapshot)
+        self._track_position(map_id, pos)
+        self._observe_screen()
+        facing = snapshot.facing
+        if self.learner is not None:
+            # Antes de _observe_result, que actualiza `_prev_key`
+            action = self._choose_learned(map_id, pos, facing)
+            self._observe_result(map_id, pos, facing)
+        elif self.planner is not None:
+            self._observe_result(map_id, pos, facing)
+            action = self._choose_frontier(map_id, pos)
+        else:
+            self._observe_result(map_id, pos, facing)
+            action = self.choose_action(pos)
+        self.last_action = action
 
-        for b in ["up","down","left","right","a","b"]:
-            self.pyboy.button_release(b)
-        
+        t_input = phase_start(self.profiler)
         try:
-            self.pyboy.button_press(action)
+            self.scheduler.act(action)
         except Exception as e:
             if self.logs % (self.log_freq * 10) == 0:
                 log_msg("error", "explorer.action_execution_error", action=action, error=str(e))
-
-        pos_after = self.read_position()
-        moved = (pos_after != pos_before)
+        phase_end(self.profiler, "input", t_input)
 
         self.noise.decay_all()
 
-        if moved and action in ("up","down","left","right"):
-            self.last_pos = pos_after
-            
-            local_r, local_c = self.world_to_local_grid(pos_after)
-            
-            if self.noise.in_bounds(local_r, local_c):
-                self.noise.add_visit(local_r, local_c)
-                
-            log_msg("debug", "explorer.moved", 
-                   from_pos=pos_before, to_pos=pos_after, 
-                   action=action, grid_pos=(local_r, local_c))
-            
-            self._stay_ticks = 0
-
-        elif action in ("up","down","left","right") and not moved:
-            self._stay_ticks += 1
-            
-            if self._stay_ticks >= 3:
-                center_r = self.noise.cfg.rows // 2
-                center_c = self.noise.cfg.cols // 2
-                
-                dr = -1 if action == "up" else (1 if action == "down" else 0)
-                dc = -1 if action == "left" else (1 if action == "right" else 0)
-                
-                blocked_r = center_r + dr
-                blocked_c = center_c + dc
-                
-                self.noise.mark_blocked(blocked_r, blocked_c, True)
-                
-                log_msg("debug", "explorer.blocked", 
-                       direction=action, ticks=self._stay_ticks,
-                       blocked_cell=(blocked_r, blocked_c))
-
-        elif action == "a":
-            if self._detect_interaction():
-                center_r = self.noise.cfg.rows // 2
-                center_c = self.noise.cfg.cols // 2
-                self.noise.add_interact(center_r, center_c)
-                
-                interest_kind = self._detect_interest_kind()
-                if interest_kind:
-                    self.noise.set_interest(center_r, center_c, interest_kind)
-
         # Actualizar estadísticas generales
-        self.visits[pos_after] = self.visits.get(pos_after, 0) + 1
+        self.visits.add(map_id, pos[0], pos[1])
         self.logs += 1
         
         # Log periódico de progreso
         if self.logs % self.log_freq == 0:
-            unique_tiles = len(self.visits)
-            total_visits = sum(self.visits.values())
+            unique_tiles = self.visits.unique
+            total_visits = self.visits.total
             
             log_msg("info", "explorer.step_summary",
-                    position=pos_after, total_steps=self.logs,
+                    position=pos, total_steps=self.logs,
                     unique_tiles=unique_tiles, total_visits=total_visits,
                     stuck_ticks=self._stay_ticks)
 
@@ -158,11 +317,47 @@ class ExplorerAgent:
             log_msg("error", "explorer.noise_map_error", error=str(e))
             return None
 
+    @property
+    def noise_version(self) -> int:
+        return self.noise.version
+
+    def get_noise_indexed(self) -> Optional[np.ndarray]:
+        """Mapa de visitas como códigos de NoiseVisitMap.to_indexed_u8 (intensidad, bloqueos e intereses)."""
+        try:
+            return self.noise.to_indexed_u8()
+        except Exception as e:
+            log_msg("error", "explorer.noise_map_error", error=str(e))
+            return None
+
+    def save_visits(self, path: str) -> None:
+        self.visits.save(path)
+
+    def load_visits(self, path: str) -> None:
+        self.visits = VisitCounter.load(path)
+
+    def save_q_table(self, path: str) -> None:
+        if self.learner is not None:
+            self.learner.save(path)
+
+    def load_q_table(self, path: str) -> int:
+        return self.learner.load(path) if self.learner is not None else 0
+
     def get_stats(self) -> Dict[str, Any]:
         return {
-            "visited_positions": len(self.visits),
-            "total_steps": sum(self.visits.values()),
+            "visited_positions": self.visits.unique,
+            "total_steps": self.visits.total,
+            "visit_histogram": self.visits.histogram(),
             "current_position": self.last_pos,
             "stuck_ticks": self._stay_ticks,
-            "grid_shape": self.noise.shape
+            "grid_shape": self.noise.shape,
+            "map_id": self._anchor_map,
+            "world_tiles": self.world.unique_tiles,
+            "world_chunks": self.world.chunk_count,
+            "mode": self.mode,
+            "plans": self.planner.plans if self.planner is not None else 0,
+            "q_states": self.learner.table.used if self.learner is not None else 0,
+            "q_updates": self.learner.updates if self.learner is not None else 0,
+            "screens": len(self.novelty),
+            "loops": self.loops,
+            "ignored_inputs": self.ignored_inputs
         }
\ No newline at end of file
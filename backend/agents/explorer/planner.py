@@ -0,0 +1,144 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+import numpy as np
+from backend.utils.world_map import WorldVisitMap
+
+# (acción, dx, dy); las filas son `y` y las columnas `x`, como en WorldVisitMap
+MOVES: Tuple[Tuple[str, int, int], ...] = (
+    ("up", 0, -1), ("down", 0, 1), ("left", -1, 0), ("right", 1, 0),
+)
+_ACTION_BY_DELTA = {(dx, dy): action for action, dx, dy in MOVES}
+
+
+def distance_field(passable: np.ndarray, start: Tuple[int, int],
+                   stop_at: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Distancia en pasos (4-vecindad) desde `start` = (fila, columna) a cada
+    casilla transitable; -1 si no se alcanza. BFS por frentes: cada iteración
+    expande el frente entero con desplazamientos de arrays en vez de casilla
+    a casilla. La casilla de partida cuenta como transitable.
+
+    Con `stop_at` termina en cuanto el frente toca alguna de esas casillas
+    (las más lejanas quedan en -1).
+    """
+    dist = np.full(passable.shape, -1, dtype=np.int32)
+    free = passable.copy()
+    free[start] = False
+    frontier = np.zeros(passable.shape, dtype=bool)
+    frontier[start] = True
+    nxt = np.empty_like(frontier)
+    dist[start] = 0
+    d = 0
+    while True:
+        nxt.fill(False)
+        nxt[1:] |= frontier[:-1]
+        nxt[:-1] |= frontier[1:]
+        nxt[:, 1:] |= frontier[:, :-1]
+        nxt[:, :-1] |= frontier[:, 1:]
+        nxt &= free
+        if not nxt.any():
+            return dist
+        d += 1
+        dist[nxt] = d
+        free ^= nxt
+        if stop_at is not None and (nxt & stop_at).any():
+            return dist
+        frontier, nxt = nxt, frontier
+
+
+@dataclass
+class PlannerConfig:
+    radius: int = 24            # ventana de (2r+1)² casillas centrada en el jugador
+    visit_weight: float = 3.0   # pasos de distancia que cuesta cada duplicación de visitas del objetivo
+
+
+class FrontierPlanner:
+    """
+    Exploración por fronteras sobre WorldVisitMap.
+
+    El objetivo es la casilla alcanzable de menor coste
+    `distancia + visit_weight * log2(1 + visitas)`: la frontera (casillas sin
+    visitar) cuando hay alguna cerca, si no la menos pisada. Lo desconocido se
+    supone transitable hasta que se marca como bloqueado. El camino hasta el
+    objetivo se guarda y se sigue paso a paso; solo se vuelve a planificar al
+    llegar, al salirse del camino o si cambian el mapa o los bloqueos
+    (`WorldVisitMap.blocked_version`).
+    """
+
+    def __init__(self, world: WorldVisitMap, cfg: PlannerConfig = PlannerConfig(),
+                 seed: Optional[int] = None):
+        self.world = world
+        self.cfg = cfg
+        self.size = 2 * cfg.radius + 1
+        self._rng = np.random.default_rng(seed)
+        self._map: Optional[int] = None
+        self._blocked_version = -1
+        self._path: List[Tuple[int, int]] = []     # casillas del mundo, del jugador al objetivo
+        self._index = 0
+        self.plans = 0
+
+    @property
+    def target(self) -> Optional[Tuple[int, int]]:
+        return self._path[-1] if self._path else None
+
+    def invalidate(self) -> None:
+        self._path = []
+        self._index = 0
+
+    def _on_path(self, map_id: int, pos: Tuple[int, int]) -> bool:
+        if (map_id != self._map or self.world.blocked_version != self._blocked_version
+                or self._index >= len(self._path) - 1):
+            return False
+        if pos == self._path[self._index]:
+            return True
+        # Avanzó una casilla desde la última consulta
+        if pos == self._path[self._index + 1] and self._index + 1 < len(self._path) - 1:
+            self._index += 1
+            return True
+        return False
+
+    def _plan(self, map_id: int, pos: Tuple[int, int]) -> None:
+        self.plans += 1
+        self.invalidate()
+        radius = self.cfg.radius
+        visits, blocked, _ = self.world.window(map_id, pos, self.size, self.size)
+        self._map = map_id
+        self._blocked_version = self.world.blocked_version
+        center = (radius, radius)
+        unvisited = visits == 0
+        unvisited[center] = False
+
+        reach = distance_field(~blocked, center, stop_at=unvisited)
+        cost = reach + self.cfg.visit_weight * np.log2(1.0 + visits)
+        # Desempate aleatorio (reproducible con la semilla) entre casillas de igual coste
+        cost += self._rng.random(cost.shape) * 0.5
+        cost[reach <= 0] = np.inf
+        idx = int(np.argmin(cost))
+        if not np.isfinite(cost.flat[idx]):
+            return
+
+        # Camino de vuelta desde el objetivo bajando por `reach`
+        r, c = divmod(idx, self.size)
+        cells = [(r, c)]
+        while reach[r, c] > 0:
+            d = reach[r, c]
+            options = [(r + dy, c + dx) for _, dx, dy in MOVES
+                       if 0 <= r + dy < self.size and 0 <= c + dx < self.size
+                       and reach[r + dy, c + dx] == d - 1]
+            r, c = options[int(self._rng.integers(len(options)))] if len(options) > 1 else options[0]
+            cells.append((r, c))
+        x0, y0 = pos[0] - radius, pos[1] - radius
+        self._path = [(x0 + c, y0 + r) for r, c in reversed(cells)]
+
+    def next_action(self, map_id: int, pos: Tuple[int, int]) -> Optional[str]:
+        """Dirección del siguiente paso hacia el objetivo; None si no hay a dónde ir."""
+        if not self._on_path(map_id, pos):
+            self._plan(map_id, pos)
+            if not self._path:
+                return None
+        nx, ny = self._path[self._index + 1]
+        return _ACTION_BY_DELTA[(nx - pos[0], ny - pos[1])]
+
+    def get_stats(self) -> dict:
+        return {"plans": self.plans, "target": self.target}
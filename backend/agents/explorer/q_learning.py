@@ -0,0 +1,175 @@
+from __future__ import annotations
+import json
+from dataclasses import asdict, dataclass
+from typing import Optional, Sequence, Tuple
+import numpy as np
+
+QL_ALGORITHMS = ("qlearning", "sarsa")
+
+_MASK64 = (1 << 64) - 1
+_HASH_MULT = 0x9E3779B97F4A7C15     # hash multiplicativo de Fibonacci
+
+
+def state_key(map_id: int, x: int, y: int, facing: int) -> int:
+    """Clave de 32 bits del estado (mapa, x, y, dirección); 0 queda libre para 'fila vacía'."""
+    return (((map_id & 0xFF) << 24) | ((x & 0xFF) << 16) | ((y & 0xFF) << 8) | (facing & 0xFF)) + 1
+
+
+@dataclass
+class QConfig:
+    algorithm: str = "qlearning"    # "qlearning" (objetivo max) o "sarsa" (acción elegida)
+    table_bits: int = 16            # 2^bits filas
+    alpha: float = 0.3
+    gamma: float = 0.9
+    epsilon: float = 0.1
+    novelty_weight: float = 1.0     # recompensa al llegar a una casilla: peso / (1 + ruido de NoiseVisitMap)
+    screen_weight: float = 0.0      # recompensa por pantalla: peso / sqrt(veces vista) (NoveltyCache); 0 = desactivada
+    step_cost: float = 0.2          # coste de cada decisión
+    initial_value: float = 2.0      # valor optimista de lo no probado: cada acción se prueba al menos una vez
+    batch_size: int = 16            # transiciones por actualización
+
+
+class QTable:
+    """
+    Tabla de valores de acceso directo por hash: la fila de un estado es
+    `hash(clave) >> (64 - bits)` y `keys` guarda qué clave la ocupa. Si otra
+    clave cae en la misma fila, la sustituye con los valores iniciales (se
+    cuenta en `evictions`); con 2^16 filas sobra para varios mapas enteros.
+    """
+
+    def __init__(self, n_actions: int, bits: int = 16, initial_value: float = 0.0):
+        self.bits = bits
+        self.initial_value = initial_value
+        self.keys = np.zeros(1 << bits, dtype=np.uint64)
+        self.values = np.zeros((1 << bits, n_actions), dtype=np.float32)
+        self.evictions = 0
+
+    def slot(self, key: int) -> int:
+        return ((key * _HASH_MULT) & _MASK64) >> (64 - self.bits)
+
+    def row(self, key: int) -> int:
+        """Fila de `key`, reclamándola si está libre u ocupada por otra clave."""
+        i = self.slot(key)
+        current = int(self.keys[i])
+        if current != key:
+            if current:
+                self.evictions += 1
+            self.keys[i] = key
+            self.values[i] = self.initial_value
+        return i
+
+    @property
+    def used(self) -> int:
+        return int(np.count_nonzero(self.keys))
+
+
+class QLearner:
+    """
+    Q-learning / SARSA tabular con política epsilon-greedy.
+
+    `act()` recibe la clave del estado actual y la recompensa obtenida desde
+    la decisión anterior; guarda la transición y devuelve la siguiente acción.
+    Las transiciones se acumulan en arrays preasignados y se aplican de
+    `batch_size` en `batch_size` con una sola actualización vectorizada
+    (las que apuntan a una fila reasignada entretanto se descartan).
+    """
+
+    def __init__(self, actions: Sequence[str], cfg: QConfig = QConfig(), seed: Optional[int] = None):
+        self.actions: Tuple[str, ...] = tuple(actions)
+        self.cfg = cfg
+        self.table = QTable(len(self.actions), cfg.table_bits, cfg.initial_value)
+        self._rng = np.random.default_rng(seed)
+        n = max(1, cfg.batch_size)
+        self._rows = np.zeros(n, dtype=np.intp)
+        self._keys = np.zeros(n, dtype=np.uint64)
+        self._acts = np.zeros(n, dtype=np.intp)
+        self._rewards = np.zeros(n, dtype=np.float32)
+        self._next_rows = np.zeros(n, dtype=np.intp)
+        self._next_acts = np.zeros(n, dtype=np.intp)
+        self._pending = 0
+        self._prev: Optional[Tuple[int, int, int]] = None    # (fila, clave, acción)
+        self.updates = 0
+        self.total_reward = 0.0
+
+    def act(self, key: int, reward: float) -> str:
+        row = self.table.row(key)
+        q = self.table.values[row]
+        if self._rng.random() < self.cfg.epsilon:
+            a = int(self._rng.integers(len(self.actions)))
+        else:
+            best = np.flatnonzero(q == q.max())
+            a = int(best[0] if best.size == 1 else self._rng.choice(best))
+        if self._prev is not None:
+            self._push(self._prev, reward, row, a)
+        self._prev = (row, key, a)
+        return self.actions[a]
+
+    def _push(self, prev: Tuple[int, int, int], reward: float, next_row: int, next_act: int) -> None:
+        i = self._pending
+        self._rows[i], self._keys[i], self._acts[i] = prev
+        self._rewards[i] = reward
+        self._next_rows[i] = next_row
+        self._next_acts[i] = next_act
+        self.total_reward += reward
+        self._pending += 1
+        if self._pending == self._rows.size:
+            self.flush()
+
+    def flush(self) -> None:
+        n = self._pending
+        if n == 0:
+            return
+        self._pending = 0
+        values = self.table.values
+        rows, acts = self._rows[:n], self._acts[:n]
+        next_rows = self._next_rows[:n]
+        if self.cfg.algorithm == "sarsa":
+            following = values[next_rows, self._next_acts[:n]]
+        else:
+            following = values[next_rows].max(axis=1)
+        target = self._rewards[:n] + np.float32(self.cfg.gamma) * following
+        delta = np.float32(self.cfg.alpha) * (target - values[rows, acts])
+        valid = self.table.keys[rows] == self._keys[:n]
+        np.add.at(values, (rows[valid], acts[valid]), delta[valid])
+        self.updates += int(np.count_nonzero(valid))
+
+    def end_episode(self) -> None:
+        """Aplica lo pendiente y corta la cadena de transiciones (el siguiente estado no sigue al anterior)."""
+        self.flush()
+        self._prev = None
+
+    def save(self, path: str) -> None:
+        self.flush()
+        meta = {"actions": list(self.actions), "config": asdict(self.cfg), "updates": self.updates}
+        used = self.table.keys != 0
+        # Con un archivo abierto numpy no añade ".npz": se guarda en `path` tal cual
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f,
+                keys=self.table.keys[used],
+                values=self.table.values[used],
+                meta=np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8),
+            )
+
+    def load(self, path: str) -> int:
+        """Carga una tabla guardada con `save`; devuelve los estados cargados."""
+        with np.load(path) as data:
+            meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+            if meta["actions"] != list(self.actions):
+                raise ValueError(f"acciones distintas: {meta['actions']} != {list(self.actions)}")
+            keys, values = data["keys"], data["values"]
+        self.end_episode()
+        self.table.keys.fill(0)
+        self.table.values.fill(0.0)
+        for key, row_values in zip(keys.tolist(), values):
+            self.table.values[self.table.row(key)] = row_values
+        self.updates = int(meta.get("updates", 0))
+        return len(keys)
+
+    def get_stats(self) -> dict:
+        return {
+            "states": self.table.used,
+            "updates": self.updates,
+            "evictions": self.table.evictions,
+            "total_reward": self.total_reward,
+        }
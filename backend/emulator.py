@@ -1,29 +1,158 @@
+import io
 import os
+import random
 import threading
 import time
 import traceback
-from typing import Tuple, Optional
+from dataclasses import dataclass
+from typing import Dict, Tuple, Optional
 from pyboy import PyBoy
 from dotenv import load_dotenv
-from backend.agents.coordinator.meta_controller import MetaController
+from backend.agents.coordinator.meta_controller import MetaController, GameContext
+from backend.agents.coordinator.context_watcher import SwitchConfig
 from backend.agents.explorer.explorer_agent import ExplorerAgent
 from backend.agents.combat.combat_agent import CombatAgent
+from backend.recorder import Recorder
+from backend.utils.frame_ring import FrameRing
+from backend.utils.input_log import InputLog
+from backend.utils.joypad import HoldTiming, InputScheduler, Joypad
+from backend.utils.ram_map import read_snapshot, rom_checksum
+from backend.utils.profiler import TickProfiler
+from backend import telemetry
 from config.logger_core import log_msg
 
 load_dotenv()
 
 last_explorer: Optional[ExplorerAgent] = None
 
-def run_pyboy_threaded() -> Tuple[Optional[PyBoy], Optional[threading.Thread]]:
-    global last_explorer
+GB_FRAME_RATE = 59.7275   # frames por segundo de la Game Boy (4194304 Hz / 70224 ciclos)
 
-    rom_path = os.getenv('ROM_PATH')
-    if not rom_path or not os.path.exists(rom_path):
-        log_msg("error", "emulator.rom_not_found", rom_path=rom_path)
-        return None, None
+# Savestates de arranque en memoria, por (ruta absoluta del ROM, punto de captura)
+_boot_states: Dict[Tuple[str, str], bytes] = {}
+_boot_states_lock = threading.Lock()
 
-    log_msg("info", "emulator.start", rom_path=os.path.abspath(rom_path))
 
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    value = (os.getenv(name) or "").strip().lower()
+    if not value:
+        return default
+    return value in ("1", "true", "yes", "on")
+
+
+@dataclass
+class RunConfig:
+    max_steps: int = 50000          # decisiones del coordinador; <= 0 = sin límite
+    frames_per_decision: int = 1    # frames emulados entre decisiones
+    turbo: bool = False             # sin render ni espera entre pasos
+    speed: float = 0.0              # múltiplo del tiempo real; 0 = sin límite (la GUI aplica el de su menú)
+    log_frequency: int = 2000
+    boot_state_at: str = "boot"     # "boot", "overworld" o "frames:N"
+    save_ram: bool = True           # guardar la RAM del cartucho (.ram) al detener
+    profile: bool = True            # tiempos por fase del bucle (TickProfiler)
+    visits_path: str = ""           # .npz de estadísticas de visitas a cargar/guardar
+    display_fps: int = 60           # frames publicados al FrameRing por segundo; <= 0 = todos
+    telemetry_port: int = 0         # puerto HTTP local de telemetría; 0 = desactivada
+    record_path: str = ""           # grabar la partida (.agmrec) desde el inicio
+    record_every: int = 1           # grabar uno de cada N pasos
+    seed: Optional[int] = None      # semilla de los agentes; None = aleatoria (se registra en el log)
+    input_log_path: str = ""        # .npz con los botones frame a frame para reproducir el episodio
+    checkpoint_every: int = 600     # frames entre puntos de control del input log
+    explorer_mode: str = "random"   # política del explorador: "random", "frontier", "qlearning" o "sarsa"
+    q_table_path: str = ""          # .npz de la tabla Q a cargar/guardar (modos qlearning/sarsa)
+    walk_frames: int = 17           # frames que se mantiene una dirección (un paso)
+    button_frames: int = 2          # frames que se mantiene a/b antes de soltarlo
+    context_hooks: bool = True      # detectar cambios de contexto con hooks de ejecución (si no, sondeo)
+    confirm_frames: int = 3         # frames que debe mantenerse un contexto nuevo antes de cambiar
+
+    def hold_timing(self) -> HoldTiming:
+        return HoldTiming(walk_frames=self.walk_frames, button_frames=self.button_frames)
+
+    def switch_config(self) -> SwitchConfig:
+        return SwitchConfig(confirm_frames=self.confirm_frames, hooks=self.context_hooks)
+
+    @classmethod
+    def from_env(cls) -> "RunConfig":
+        return cls(
+            max_steps=_env_int("MAX_STEPS", cls.max_steps),
+            frames_per_decision=max(1, _env_int("FRAMES_PER_DECISION", cls.frames_per_decision)),
+            turbo=_env_flag("TURBO", cls.turbo),
+            speed=max(0.0, _env_float("SPEED", cls.speed)),
+            log_frequency=max(1, _env_int("LOG_FREQUENCY", cls.log_frequency)),
+            boot_state_at=(os.getenv("BOOT_STATE_AT") or cls.boot_state_at).strip().lower(),
+            save_ram=_env_flag("SAVE_RAM", cls.save_ram),
+            profile=_env_flag("PROFILE", cls.profile),
+            visits_path=os.getenv("VISITS_PATH") or cls.visits_path,
+            display_fps=_env_int("DISPLAY_FPS", cls.display_fps),
+            telemetry_port=_env_int("TELEMETRY_PORT", cls.telemetry_port),
+            record_path=os.getenv("RECORD_PATH") or cls.record_path,
+            record_every=max(1, _env_int("RECORD_EVERY", cls.record_every)),
+            seed=_env_int("SEED", -1) if os.getenv("SEED") else None,
+            input_log_path=os.getenv("INPUT_LOG") or cls.input_log_path,
+            checkpoint_every=max(1, _env_int("CHECKPOINT_EVERY", cls.checkpoint_every)),
+            explorer_mode=(os.getenv("EXPLORER_MODE") or cls.explorer_mode).strip().lower(),
+            q_table_path=os.getenv("Q_TABLE") or cls.q_table_path,
+            walk_frames=max(1, _env_int("WALK_FRAMES", cls.walk_frames)),
+            button_frames=max(1, _env_int("BUTTON_FRAMES", cls.button_frames)),
+            context_hooks=_env_flag("CONTEXT_HOOKS", cls.context_hooks),
+            confirm_frames=max(0, _env_int("CONFIRM_FRAMES", cls.confirm_frames)),
+        )
+
+
+def save_state_bytes(pyboy: PyBoy) -> bytes:
+    buf = io.BytesIO()
+    pyboy.save_state(buf)
+    return buf.getvalue()
+
+
+def load_state_bytes(pyboy: PyBoy, state: bytes) -> None:
+    pyboy.load_state(io.BytesIO(state))
+
+
+def get_boot_state(rom_path: str, point: str) -> Optional[bytes]:
+    with _boot_states_lock:
+        return _boot_states.get((os.path.abspath(rom_path), point))
+
+
+def store_boot_state(rom_path: str, point: str, state: bytes) -> None:
+    with _boot_states_lock:
+        _boot_states[(os.path.abspath(rom_path), point)] = state
+    log_msg("info", "emulator.boot_state_captured", point=point, size=len(state))
+
+
+def clear_boot_states() -> None:
+    with _boot_states_lock:
+        _boot_states.clear()
+
+
+def boot_point_reached(point: str, pyboy: PyBoy, coordinator: MetaController, frame_count: int) -> bool:
+    """Indica si el punto de captura configurado se alcanzó en este paso."""
+    if point == "overworld":
+        # Primer frame con el jugador colocado en un mapa fuera de combate/menú
+        return (coordinator.get_current_context() == GameContext.EXPLORATION
+                and (coordinator.last_snapshot or read_snapshot(pyboy)).position != (0, 0))
+    if point.startswith("frames:"):
+        try:
+            return frame_count >= int(point.split(":", 1)[1])
+        except ValueError:
+            return False
+    return False
+
+
+def create_pyboy(rom_path: str, boot_state: Optional[bytes] = None) -> Optional[PyBoy]:
     pyboy = PyBoy(
         rom_path,
         window="null",
@@ -31,56 +160,412 @@ def run_pyboy_threaded() -> Tuple[Optional[PyBoy], Optional[threading.Thread]]:
         debug=False
     )
 
-    for _ in range(10):
-        if not pyboy.tick():
-            break
+    if boot_state is not None:
+        load_state_bytes(pyboy, boot_state)
+    else:
+        for _ in range(10):
+            if not pyboy.tick():
+                break
 
     if not hasattr(pyboy, 'screen'):
         log_msg("error", "emulator.no_screen_buffer")
         pyboy.stop()
-        return None, None
+        return None
+    return pyboy
 
-    coordinator = MetaController(pyboy)
-    explorer = ExplorerAgent(pyboy)
-    combat = CombatAgent(pyboy)
-    coordinator.register_agents(explorer, combat)
 
-    last_explorer = explorer
+def create_agents(pyboy: PyBoy, profiler: Optional[TickProfiler] = None, seed: Optional[int] = None,
+                  explorer_mode: str = "random", timing: Optional[HoldTiming] = None,
+                  switch: Optional[SwitchConfig] = None
+                  ) -> Tuple[MetaController, ExplorerAgent, CombatAgent]:
+    # Un Joypad compartido: los agentes se turnan sobre los mismos botones
+    scheduler = InputScheduler(Joypad(pyboy), timing)
+    coordinator = MetaController(pyboy, profiler, switch)
+    explorer = ExplorerAgent(pyboy, seed=seed, scheduler=scheduler, mode=explorer_mode)
+    combat = CombatAgent(pyboy, seed=None if seed is None else seed + 1, scheduler=scheduler)
+    coordinator.register_agents(explorer, combat, scheduler)
+    return coordinator, explorer, combat
 
-    log_msg("info", "emulator.agents_created",
-           coordinator=type(coordinator).__name__,
-           explorer=type(explorer).__name__,
-           combat=type(combat).__name__)
 
-    def emulator_loop():
+class EmulatorThread(threading.Thread):
+    """Hilo que ejecuta `emulator_loop` sobre un PyBoy ya creado."""
+
+    def __init__(self, pyboy: PyBoy, rom_path: str, cfg: RunConfig,
+                 start_state: Optional[bytes] = None):
+        super().__init__(daemon=True)
+        self.pyboy = pyboy
+        self.rom_path = rom_path
+        self.cfg = cfg
+        self.profiler: Optional[TickProfiler] = TickProfiler() if cfg.profile else None
+        # Frames para la interfaz; solo se publican cuando se renderiza
+        self.frame_ring = FrameRing()
+        # Semilla base de los agentes; cada episodio deriva la suya
+        self.seed = cfg.seed if cfg.seed is not None else random.randrange(1 << 31)
+        self.episodes = 1
+        self.coordinator, self.explorer, self.combat = self._create_agents()
+        self._load_visits()
+        self._load_q_table()
+        # Estado al que vuelve restart(); el savestate de arranque si ya existía
+        self._start_state = start_state or save_state_bytes(pyboy)
+        self._boot_captured = get_boot_state(rom_path, cfg.boot_state_at) is not None
+        self._stop_event = threading.Event()
+        self._restart_event = threading.Event()
+        # Control de ejecución: pausa, pasos sueltos y velocidad
+        self._control = threading.Condition()
+        self._paused = False
+        self._pending_steps = 0
+        self._speed = 0.0 if cfg.turbo else cfg.speed
+        # Contadores monótonos para la telemetría; no se reinician con restart()
+        self.steps_total = 0
+        self.frames_total = 0
+        self.instance_id = telemetry.register(self)
+        self.recorder: Optional[Recorder] = None
+        self.input_log: Optional[InputLog] = None
+
+    def _notify_control(self) -> None:
+        with self._control:
+            self._control.notify_all()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._notify_control()
+
+    def restart(self) -> bool:
+        """Reinicia el episodio sobre la instancia viva; False si el hilo ya terminó."""
+        if not self.is_alive():
+            return False
+        self._restart_event.set()
+        self._notify_control()
+        return True
+
+    @property
+    def paused(self) -> bool:
+        return self._paused
+
+    @property
+    def speed(self) -> float:
+        return self._speed
+
+    def pause(self) -> None:
+        """Detiene el bucle en una espera sin consumo de CPU hasta resume() o step_once()."""
+        with self._control:
+            if self._paused:
+                return
+            self._paused = True
+        log_msg("info", "emulator.paused")
+
+    def resume(self) -> None:
+        with self._control:
+            if not self._paused:
+                return
+            self._paused = False
+            self._pending_steps = 0
+            self._control.notify_all()
+        log_msg("info", "emulator.resumed")
+
+    def step_once(self, steps: int = 1) -> None:
+        """Pausa (si no lo estaba) y ejecuta `steps` decisiones del coordinador."""
+        self.pause()
+        with self._control:
+            self._pending_steps += max(1, steps)
+            self._control.notify_all()
+
+    def set_speed(self, multiplier: float) -> None:
+        """1.0 = tiempo real (59.73 frames/s), 2.0 = doble, 0 = sin límite."""
+        self._speed = max(0.0, float(multiplier))
+        log_msg("info", "emulator.speed_changed", speed=self._speed)
+
+    def _wait_while_paused(self) -> bool:
+        """Bloquea mientras esté en pausa sin pasos pendientes; True si hubo que esperar."""
+        with self._control:
+            if not self._paused:
+                return False
+            while (self._paused and self._pending_steps == 0
+                   and not self._stop_event.is_set() and not self._restart_event.is_set()):
+                self._control.wait()
+            if self._paused and self._pending_steps > 0:
+                self._pending_steps -= 1
+            return True
+
+    def _episode_seed(self) -> int:
+        return self.seed + 1000 * (self.episodes - 1)
+
+    def _create_agents(self) -> Tuple[MetaController, ExplorerAgent, CombatAgent]:
+        cfg = self.cfg
+        return create_agents(self.pyboy, self.profiler, self._episode_seed(), cfg.explorer_mode,
+                             cfg.hold_timing(), cfg.switch_config())
+
+    def _reset_episode(self) -> None:
+        global last_explorer
+        self._finish_input_log()
+        state = get_boot_state(self.rom_path, self.cfg.boot_state_at) or self._start_state
+        # PyBoy conserva los botones pulsados a través de load_state
+        self.explorer.joypad.reset()
+        load_state_bytes(self.pyboy, state)
+        self.episodes += 1
+        self.coordinator.close()
+        learner, visits = self.explorer.learner, self.explorer.visits
+        self.coordinator, self.explorer, self.combat = self._create_agents()
+        # Las estadísticas de visitas son de toda la ejecución, no del episodio
+        self.explorer.visits = visits
+        if learner is not None:
+            # Lo aprendido sigue valiendo en el episodio siguiente
+            learner.end_episode()
+            self.explorer.learner = learner
+        last_explorer = self.explorer
+        log_msg("info", "emulator.episode_restarted", point=self.cfg.boot_state_at)
+        if self.cfg.input_log_path:
+            self._start_input_log()
+
+    def _start_input_log(self) -> None:
+        joypad = self.explorer.joypad
+        joypad.reset()
+        self.input_log = InputLog(save_state_bytes(self.pyboy), self.pyboy.frame_count,
+                                  seed=self._episode_seed(),
+                                  frames_per_decision=self.cfg.frames_per_decision,
+                                  rom_checksum=rom_checksum(self.pyboy))
+        joypad.log = self.input_log
+        log_msg("info", "emulator.seed", seed=self._episode_seed(), episode=self.episodes)
+
+    def _finish_input_log(self) -> None:
+        ilog, self.input_log = self.input_log, None
+        if ilog is None:
+            return
+        self.explorer.joypad.log = None
+        ilog.end_frame = self.pyboy.frame_count - ilog.base_frame
+        path = self.cfg.input_log_path
+        if self.episodes > 1:
+            root, ext = os.path.splitext(path)
+            path = f"{root}_ep{self.episodes}{ext or '.npz'}"
+        try:
+            ilog.save(path)
+            log_msg("info", "emulator.input_log_saved", path=path, frames=ilog.end_frame,
+                   changes=len(ilog.frames), checkpoints=len(ilog.checkpoints))
+        except Exception as e:
+            log_msg("error", "emulator.input_log_error", path=path, error=str(e))
+
+    def _load_visits(self) -> None:
+        path = self.cfg.visits_path
+        if path and os.path.exists(path):
+            try:
+                self.explorer.load_visits(path)
+                log_msg("info", "emulator.visits_loaded", path=path,
+                       unique=self.explorer.visits.unique)
+            except Exception as e:
+                log_msg("error", "emulator.visits_io_error", path=path, error=str(e))
+
+    def _save_visits(self) -> None:
+        path = self.cfg.visits_path
+        if path:
+            try:
+                self.explorer.save_visits(path)
+                log_msg("info", "emulator.visits_saved", path=path,
+                       unique=self.explorer.visits.unique)
+            except Exception as e:
+                log_msg("error", "emulator.visits_io_error", path=path, error=str(e))
+
+    def _load_q_table(self) -> None:
+        path = self.cfg.q_table_path
+        if path and os.path.exists(path) and self.explorer.learner is not None:
+            try:
+                states = self.explorer.load_q_table(path)
+                log_msg("info", "emulator.q_table_loaded", path=path, states=states)
+            except Exception as e:
+                log_msg("error", "emulator.q_table_io_error", path=path, error=str(e))
+
+    def _save_q_table(self) -> None:
+        path = self.cfg.q_table_path
+        if path and self.explorer.learner is not None:
+            try:
+                self.explorer.save_q_table(path)
+                log_msg("info", "emulator.q_table_saved", path=path,
+                       states=self.explorer.learner.table.used)
+            except Exception as e:
+                log_msg("error", "emulator.q_table_io_error", path=path, error=str(e))
+
+    @property
+    def recording(self) -> bool:
+        return self.recorder is not None
+
+    def start_recording(self, path: Optional[str] = None, every: Optional[int] = None) -> Recorder:
+        """Empieza a grabar frames, acción y contexto; sustituye una grabación en curso."""
+        self.stop_recording()
+        path = path or os.path.join("recordings", time.strftime("%d%m%y_%H%M%S") + ".agmrec")
+        self.recorder = Recorder(path, every=every or self.cfg.record_every,
+                                 meta={"rom": os.path.basename(self.rom_path),
+                                       "frames_per_decision": self.cfg.frames_per_decision})
+        return self.recorder
+
+    def stop_recording(self) -> Optional[dict]:
+        rec, self.recorder = self.recorder, None
+        if rec is None:
+            return None
+        rec.close()
+        return rec.get_stats()
+
+    def get_profile_stats(self) -> Dict[str, Dict[str, float]]:
+        return self.profiler.get_stats() if self.profiler is not None else {}
+
+    def run(self) -> None:
+        self.emulator_loop()
+
+    def emulator_loop(self):
+        pyboy = self.pyboy
+        cfg = self.cfg
         step_count = 0
-        max_steps = 50000
-        log_frequency = 2000
+        frame_count = 0
+        max_steps = cfg.max_steps
+        frames_per_decision = cfg.frames_per_decision
+        log_frequency = cfg.log_frequency
+        render = not cfg.turbo
+        ring = self.frame_ring if render else None
+        publish_interval = 1_000_000_000 // cfg.display_fps if cfg.display_fps > 0 else 0
+        next_publish = 0
+        next_deadline = time.perf_counter()
+        prof = self.profiler
+        clock = time.perf_counter_ns
+        started = time.perf_counter()
+        if cfg.record_path and self.recorder is None:
+            self.start_recording(cfg.record_path)
+        if cfg.input_log_path:
+            self._start_input_log()
+        else:
+            log_msg("info", "emulator.seed", seed=self._episode_seed(), episode=self.episodes)
+        checkpoint_every = cfg.checkpoint_every
         try:
-            while step_count < max_steps:
-                if not pyboy.tick():
+            while max_steps <= 0 or step_count < max_steps:
+                if self._paused and self._wait_while_paused():
+                    # Tras la pausa: sin ráfaga de recuperación y con el frame visible
+                    next_deadline = time.perf_counter()
+                    next_publish = 0
+                t_loop = clock()
+                if self._stop_event.is_set():
+                    break
+                if self._restart_event.is_set():
+                    self._restart_event.clear()
+                    self._reset_episode()
+                    step_count = 0
+                # En turbo solo se renderizan los frames que se graban
+                rec = self.recorder
+                rec_due = rec is not None and (self.steps_total + 1) % rec.every == 0
+                if not pyboy.tick(frames_per_decision, render or rec_due):
                     log_msg("info", "emulator.tick_failed", step=step_count)
                     break
-                coordinator.step()
+                t_tick = clock()
+                frame_count += frames_per_decision
+                ilog = self.input_log
+                if ilog is not None and (pyboy.frame_count - ilog.base_frame
+                                         >= len(ilog.checkpoints) * checkpoint_every):
+                    # Antes de la decisión: la reproducción comprueba antes de aplicar la entrada
+                    ilog.add_checkpoint(pyboy)
+                self.coordinator.step()
                 step_count += 1
+                self.steps_total += 1
+                self.frames_total += frames_per_decision
+                t_decision = clock()
+                t_post = t_decision
+                if rec_due:
+                    rec.record(self.steps_total, self.frames_total, pyboy.screen.ndarray,
+                               self.coordinator.current_context.value, self.coordinator.last_action)
+                    t_post = clock()
+                    if prof is not None:
+                        prof.add("record", t_post - t_decision)
+                if ring is not None and t_post >= next_publish:
+                    t_pub = t_post
+                    ring.publish(pyboy.screen.ndarray)
+                    next_publish = t_pub + publish_interval
+                    t_post = clock()
+                    if prof is not None:
+                        prof.add("publish", t_post - t_pub)
+                if not self._boot_captured and boot_point_reached(cfg.boot_state_at, pyboy,
+                                                                  self.coordinator, frame_count):
+                    store_boot_state(self.rom_path, cfg.boot_state_at, save_state_bytes(pyboy))
+                    self._boot_captured = True
                 if step_count % log_frequency == 0:
-                    stats = explorer.get_stats()
+                    stats = self.explorer.get_stats()
                     log_msg("info", "system.thread_progress",
                            step=step_count, max_steps=max_steps,
                            visited=stats["visited_positions"],
                            pos=stats["current_position"])
-                time.sleep(0.001)
+                    if prof is not None:
+                        prof.add("logging", clock() - t_post)
+                if prof is not None:
+                    prof.add("tick", t_tick - t_loop)
+                    prof.add("decision", t_decision - t_tick)
+                    prof.add("loop", clock() - t_loop)
+                speed = self._speed
+                if speed > 0.0:
+                    # Ritmo de la Game Boy escalado por `speed`; si va más de 0.25 s
+                    # por detrás se descarta el retraso en lugar de recuperarlo
+                    next_deadline += frames_per_decision / (GB_FRAME_RATE * speed)
+                    delay = next_deadline - time.perf_counter()
+                    if delay > 0.0:
+                        time.sleep(delay)
+                    elif delay < -0.25:
+                        next_deadline = time.perf_counter()
         except Exception as e:
             tb = traceback.format_exc()
             log_msg("error", "emulator.thread_error",
                    error=f"{type(e).__name__}: {e}",
                    traceback=tb)
         finally:
-            pyboy.stop()
+            elapsed = max(time.perf_counter() - started, 1e-9)
+            log_msg("info", "emulator.run_summary",
+                   steps=step_count, frames=frame_count,
+                   elapsed=f"{elapsed:.2f}",
+                   fps=f"{frame_count / elapsed:.1f}",
+                   dps=f"{step_count / elapsed:.1f}")
+            self._save_visits()
+            self._save_q_table()
+            self.stop_recording()
+            self._finish_input_log()
+            pyboy.stop(save=cfg.save_ram)
+            # Un hilo terminado no debe dejar /health en 503 mientras siga referenciado
+            telemetry.unregister(self.instance_id)
             log_msg("info", "emulator.thread_stopped")
 
-    thread = threading.Thread(target=emulator_loop, daemon=True)
+
+def run_pyboy_threaded(config: Optional[RunConfig] = None) -> Tuple[Optional[PyBoy], Optional[EmulatorThread]]:
+    global last_explorer
+
+    cfg = config or RunConfig.from_env()
+
+    rom_path = os.getenv('ROM_PATH')
+    if not rom_path or not os.path.exists(rom_path):
+        log_msg("error", "emulator.rom_not_found", rom_path=rom_path)
+        return None, None
+
+    log_msg("info", "emulator.start", rom_path=os.path.abspath(rom_path))
+
+    boot_state = get_boot_state(rom_path, cfg.boot_state_at)
+    pyboy = create_pyboy(rom_path, boot_state)
+    if pyboy is None:
+        return None, None
+
+    if boot_state is None and cfg.boot_state_at == "boot":
+        boot_state = save_state_bytes(pyboy)
+        store_boot_state(rom_path, cfg.boot_state_at, boot_state)
+    elif boot_state is not None:
+        log_msg("info", "emulator.boot_state_loaded", point=cfg.boot_state_at)
+
+    thread = EmulatorThread(pyboy, rom_path, cfg, boot_state)
+    last_explorer = thread.explorer
+
+    log_msg("info", "emulator.agents_created",
+           coordinator=type(thread.coordinator).__name__,
+           explorer=type(thread.explorer).__name__,
+           combat=type(thread.combat).__name__)
+
+    if cfg.turbo:
+        pyboy.set_emulation_speed(0)
+        log_msg("info", "emulator.turbo_enabled",
+               frames_per_decision=cfg.frames_per_decision,
+               max_steps=cfg.max_steps)
+
+    if cfg.telemetry_port > 0:
+        telemetry.start_server(cfg.telemetry_port)
+
     thread.start()
 
     log_msg("info", "emulator.thread_started", rom_path=rom_path)
-    return pyboy, thread
\ No newline at end of file
+    return pyboy, thread
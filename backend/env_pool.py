@@ -0,0 +1,196 @@
+import multiprocessing as mp
+import os
+import traceback
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from backend.agents.coordinator.meta_controller import GameContext
+from backend.utils.ram_map import read_snapshot
+from backend.emulator import (RunConfig, create_agents, create_pyboy, get_boot_state,
+                              load_state_bytes, save_state_bytes)
+from config.logger_core import log_msg
+
+OBS_FIELDS = ("x", "y", "map_id", "context")
+STAT_FIELDS = ("steps", "frames", "visited_positions", "total_steps")
+
+_CONTEXT_CODES = {ctx: i for i, ctx in enumerate(GameContext)}
+
+
+def _observe(pyboy, coordinator) -> Tuple[int, ...]:
+    snap = read_snapshot(pyboy)
+    return (snap.player_x, snap.player_y, snap.map_id,
+            _CONTEXT_CODES[coordinator.get_current_context()])
+
+
+def _episode_seed(cfg: RunConfig, worker_id: int, episode: int) -> Optional[int]:
+    """Semilla de los agentes de un worker en un episodio: distinta por worker, reproducible."""
+    return None if cfg.seed is None else cfg.seed + 1000 * episode + worker_id
+
+
+def _worker_main(conn, worker_id: int, rom_path: str, cfg: RunConfig,
+                 boot_state: Optional[bytes]) -> None:
+    """Proceso hijo: un PyBoy sin render con su propia pila de agentes."""
+    pyboy = None
+    try:
+        pyboy = create_pyboy(rom_path, boot_state)
+        if pyboy is None:
+            conn.send(("error", "no_screen_buffer"))
+            return
+        if cfg.turbo:
+            pyboy.set_emulation_speed(0)
+
+        initial_state = boot_state or save_state_bytes(pyboy)
+        episode = 0
+        coordinator, explorer, _ = create_agents(pyboy, seed=_episode_seed(cfg, worker_id, episode),
+                                                 explorer_mode=cfg.explorer_mode,
+                                                 timing=cfg.hold_timing(), switch=cfg.switch_config())
+        steps = 0
+        frames = 0
+        conn.send(("ready", worker_id))
+
+        while True:
+            cmd, arg = conn.recv()
+            if cmd == "step":
+                alive = True
+                for _ in range(arg):
+                    if not pyboy.tick(cfg.frames_per_decision, False):
+                        alive = False
+                        break
+                    frames += cfg.frames_per_decision
+                    coordinator.step()
+                    steps += 1
+                stats = explorer.get_stats()
+                conn.send(("ok", (_observe(pyboy, coordinator),
+                                  (steps, frames, stats["visited_positions"], stats["total_steps"]),
+                                  alive)))
+            elif cmd == "tiles":
+                conn.send(("ok", explorer.observation.tiles()))
+            elif cmd == "reset":
+                explorer.joypad.reset()
+                load_state_bytes(pyboy, initial_state)
+                coordinator.close()
+                episode += 1
+                learner, visits = explorer.learner, explorer.visits
+                coordinator, explorer, _ = create_agents(pyboy, seed=_episode_seed(cfg, worker_id, episode),
+                                                         explorer_mode=cfg.explorer_mode,
+                                                         timing=cfg.hold_timing(),
+                                                         switch=cfg.switch_config())
+                explorer.visits = visits
+                if learner is not None:
+                    learner.end_episode()
+                    explorer.learner = learner
+                steps = 0
+                frames = 0
+                conn.send(("ok", (_observe(pyboy, coordinator), (0, 0, visits.unique, visits.total), True)))
+            elif cmd == "close":
+                break
+            else:
+                conn.send(("error", f"comando desconocido: {cmd}"))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    except Exception as e:
+        try:
+            conn.send(("error", f"{type(e).__name__}: {e}\n{traceback.format_exc()}"))
+        except Exception:
+            pass
+    finally:
+        if pyboy is not None:
+            # Sin guardar: todos los workers comparten el mismo archivo .ram
+            pyboy.stop(save=False)
+        conn.close()
+
+
+class EmulatorPool:
+    """
+    Conjunto de N emuladores en procesos separados con API por lotes.
+
+    `reset()` y `step()` devuelven observaciones apiladas de forma
+    (num_workers, len(OBS_FIELDS)); `step()` además devuelve un dict de
+    arrays (num_workers,) con las estadísticas de STAT_FIELDS y `alive`.
+    """
+
+    def __init__(self, num_workers: Optional[int] = None, config: Optional[RunConfig] = None,
+                 rom_path: Optional[str] = None):
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.config = config or RunConfig.from_env()
+        self.rom_path = rom_path or os.getenv('ROM_PATH')
+        if not self.rom_path or not os.path.exists(self.rom_path):
+            log_msg("error", "emulator.rom_not_found", rom_path=self.rom_path)
+            raise FileNotFoundError(self.rom_path)
+
+        # Si este proceso ya capturó el arranque, los workers empiezan desde ahí
+        boot_state = get_boot_state(self.rom_path, self.config.boot_state_at)
+        ctx = mp.get_context("spawn")
+        self._conns: List[Any] = []
+        self._procs: List[Any] = []
+        for worker_id in range(self.num_workers):
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=_worker_main,
+                               args=(child, worker_id, self.rom_path, self.config, boot_state),
+                               daemon=True)
+            proc.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(proc)
+
+        for worker_id, conn in enumerate(self._conns):
+            status, payload = conn.recv()
+            if status != "ready":
+                self.close()
+                raise RuntimeError(f"worker {worker_id}: {payload}")
+
+        log_msg("info", "pool.started", workers=self.num_workers,
+                frames_per_decision=self.config.frames_per_decision)
+
+    def _broadcast(self, cmd: str, arg: Any = None) -> List[Any]:
+        for conn in self._conns:
+            conn.send((cmd, arg))
+        # Se leen todas las respuestas antes de fallar: si no, las pendientes se
+        # tomarían como respuesta al siguiente comando
+        replies = [conn.recv() for conn in self._conns]
+        errors = [f"worker {worker_id}: {payload}"
+                  for worker_id, (status, payload) in enumerate(replies) if status != "ok"]
+        if errors:
+            raise RuntimeError("\n".join(errors))
+        return [payload for _, payload in replies]
+
+    @staticmethod
+    def _stack(results: List[Any]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        obs = np.array([r[0] for r in results], dtype=np.int32)
+        raw = np.array([r[1] for r in results], dtype=np.int64)
+        stats = {name: raw[:, i] for i, name in enumerate(STAT_FIELDS)}
+        stats["alive"] = np.array([r[2] for r in results], dtype=bool)
+        return obs, stats
+
+    def reset(self) -> np.ndarray:
+        obs, _ = self._stack(self._broadcast("reset"))
+        return obs
+
+    def step(self, decisions: int = 1) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Avanza `decisions` pasos del coordinador en todos los workers en paralelo."""
+        return self._stack(self._broadcast("step", max(1, decisions)))
+
+    def observe_tiles(self) -> np.ndarray:
+        """Vista de casillas (num_workers, 18, 20) uint16 de cada worker (ObservationEncoder)."""
+        return np.stack(self._broadcast("tiles"))
+
+    def close(self) -> None:
+        for conn in self._conns:
+            try:
+                conn.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for proc in self._procs:
+            proc.join(5)
+            if proc.is_alive():
+                proc.terminate()
+        for conn in self._conns:
+            conn.close()
+        self._conns = []
+        self._procs = []
+        log_msg("info", "pool.stopped", workers=self.num_workers)
+
+    def __enter__(self) -> "EmulatorPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,192 @@
+"""
+Grabación de partidas: frames, acción elegida y contexto de cada paso.
+
+El bucle del emulador solo copia el frame a un buffer libre de un pool
+preasignado y lo encola; un hilo escritor lo comprime y lo escribe. Si el
+escritor va por detrás y no quedan buffers, el paso se descarta (y se
+cuenta) en lugar de frenar el bucle.
+
+Formato del archivo (.agmrec):
+    MAGIC
+    u32 longitud + cabecera JSON (forma del frame, intervalo de keyframes, ...)
+    registros: u8 tipo, u32 paso, u32 frame, u8+bytes contexto,
+               u8+bytes acción, u32 longitud + datos zlib
+Los keyframes guardan el frame RGBA completo; los deltas, el XOR con el
+frame anterior del archivo, que deja en cero todo lo que no cambia (el
+canal alfa incluido); un frame idéntico al anterior se guarda sin datos.
+Se guarda RGBA porque copiar el frame entero es
+una copia contigua; quitar el alfa en el bucle costaría una copia con
+saltos decenas de veces más lenta.
+"""
+from __future__ import annotations
+import json
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from typing import BinaryIO, Iterator, Optional, Tuple
+import numpy as np
+from config.logger_core import log_msg
+
+MAGIC = b"AGMREC1\n"
+KIND_KEY = 0
+KIND_DELTA = 1
+KIND_REPEAT = 2     # frame idéntico al anterior: sin datos
+
+_HEAD = struct.Struct("<BII")
+_LEN8 = struct.Struct("<B")
+_LEN32 = struct.Struct("<I")
+
+
+def _pack_str(value: Optional[str]) -> bytes:
+    raw = (value or "").encode("utf-8")[:255]
+    return _LEN8.pack(len(raw)) + raw
+
+
+class Recorder:
+    """
+    Graba en segundo plano. `record()` se llama desde el bucle del emulador y
+    nunca bloquea; `close()` vacía la cola y cierra el archivo.
+    """
+
+    def __init__(self, path: str, frame_shape: Tuple[int, int, int] = (144, 160, 4),
+                 every: int = 1, keyframe_interval: int = 120, queue_size: int = 64,
+                 level: int = 1, meta: Optional[dict] = None):
+        self.path = path
+        self.every = max(1, every)
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.level = level
+        self.frame_shape = tuple(frame_shape)
+        self.records = 0
+        self.dropped = 0
+        self.bytes_written = 0
+
+        # Pool de buffers: `_free` guarda los índices libres, `_pending` los llenos
+        self._buffers = np.empty((queue_size,) + self.frame_shape, dtype=np.uint8)
+        self._free: "queue.SimpleQueue[int]" = queue.SimpleQueue()
+        for i in range(queue_size):
+            self._free.put(i)
+        self._pending: "queue.SimpleQueue" = queue.SimpleQueue()
+
+        dirname = os.path.dirname(os.path.abspath(path))
+        os.makedirs(dirname, exist_ok=True)
+        self._file: BinaryIO = open(path, "wb")
+        header = {
+            "version": 1,
+            "frame_shape": list(self.frame_shape),
+            "every": self.every,
+            "keyframe_interval": self.keyframe_interval,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        header.update(meta or {})
+        raw = json.dumps(header).encode("utf-8")
+        self._write(MAGIC + _LEN32.pack(len(raw)) + raw)
+
+        self._writer = threading.Thread(target=self._drain, name="recorder", daemon=True)
+        self._writer.start()
+        log_msg("info", "recorder.started", path=path, every=self.every)
+
+    def _write(self, data: bytes) -> None:
+        self._file.write(data)
+        self.bytes_written += len(data)
+
+    def record(self, step: int, frame_index: int, frame: np.ndarray,
+               context: Optional[str], action: Optional[str]) -> bool:
+        try:
+            idx = self._free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return False
+        np.copyto(self._buffers[idx], frame)
+        self._pending.put((idx, step, frame_index, context, action))
+        return True
+
+    def _drain(self) -> None:
+        prev = np.zeros(self.frame_shape, dtype=np.uint8)
+        delta = np.empty_like(prev)
+        since_key = self.keyframe_interval
+        try:
+            while True:
+                item = self._pending.get()
+                if item is None:
+                    break
+                idx, step, frame_index, context, action = item
+                frame = self._buffers[idx]
+                if since_key >= self.keyframe_interval:
+                    kind, payload = KIND_KEY, frame
+                    since_key = 0
+                else:
+                    np.bitwise_xor(frame, prev, out=delta)
+                    kind, payload = (KIND_DELTA, delta) if delta.any() else (KIND_REPEAT, None)
+                since_key += 1
+                if payload is None:
+                    data = b""
+                else:
+                    data = zlib.compress(payload, self.level)
+                    np.copyto(prev, frame)
+                self._free.put(idx)
+                self._write(_HEAD.pack(kind, step, frame_index) + _pack_str(context)
+                            + _pack_str(action) + _LEN32.pack(len(data)) + data)
+                self.records += 1
+        except Exception as e:
+            log_msg("error", "recorder.write_error", path=self.path, error=str(e))
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self._pending.put(None)
+        self._writer.join()
+        self._file.close()
+        log_msg("info", "recorder.stopped", path=self.path, records=self.records,
+               dropped=self.dropped, size=self.bytes_written)
+
+    def get_stats(self) -> dict:
+        return {
+            "path": self.path,
+            "records": self.records,
+            "dropped": self.dropped,
+            "bytes": self.bytes_written,
+        }
+
+
+def read_recording(path: str) -> Tuple[dict, Iterator[Tuple[int, int, str, str, np.ndarray]]]:
+    """
+    Abre una grabación y devuelve (cabecera, iterador de registros). Cada
+    registro es (paso, frame, contexto, acción, frame reconstruido).
+    """
+    f = open(path, "rb")
+    if f.read(len(MAGIC)) != MAGIC:
+        f.close()
+        raise ValueError(f"{path} no es una grabación de AgentMon")
+    (n,) = _LEN32.unpack(f.read(_LEN32.size))
+    header = json.loads(f.read(n).decode("utf-8"))
+    shape = tuple(header["frame_shape"])
+
+    def _read_str() -> str:
+        (length,) = _LEN8.unpack(f.read(_LEN8.size))
+        return f.read(length).decode("utf-8")
+
+    def _records():
+        frame = np.zeros(shape, dtype=np.uint8)
+        with f:
+            while True:
+                head = f.read(_HEAD.size)
+                if len(head) < _HEAD.size:
+                    return
+                kind, step, frame_index = _HEAD.unpack(head)
+                context, action = _read_str(), _read_str()
+                (length,) = _LEN32.unpack(f.read(_LEN32.size))
+                raw = f.read(length)
+                if kind == KIND_REPEAT:
+                    yield step, frame_index, context, action, frame
+                    continue
+                data = np.frombuffer(zlib.decompress(raw), dtype=np.uint8).reshape(shape)
+                if kind == KIND_KEY:
+                    frame = data.copy()
+                else:
+                    frame = np.bitwise_xor(frame, data)
+                yield step, frame_index, context, action, frame
+
+    return header, _records()
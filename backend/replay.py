@@ -0,0 +1,85 @@
+"""
+Reproducción de un InputLog sin agentes: carga el savestate inicial, aplica
+las máscaras de botones en sus frames y avanza con `tick(n, False)` entre
+cambios, comprobando los puntos de control por el camino.
+"""
+from __future__ import annotations
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+from backend.emulator import create_pyboy
+from backend.utils.input_log import Checkpoint, InputLog, take_checkpoint
+from backend.utils.joypad import Joypad, apply_mask
+from backend.utils.ram_map import rom_checksum
+from config.logger_core import log_msg
+
+
+@dataclass
+class ReplayResult:
+    frames: int
+    elapsed: float
+    checkpoints: int
+    mismatches: List[Tuple[Checkpoint, Checkpoint]] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.mismatches
+
+    @property
+    def fps(self) -> float:
+        return self.frames / max(self.elapsed, 1e-9)
+
+
+def replay(rom_path: str, log: InputLog, verify: bool = True,
+           stop_on_mismatch: bool = False) -> Optional[ReplayResult]:
+    pyboy = create_pyboy(rom_path, log.initial_state)
+    if pyboy is None:
+        return None
+    checksum = rom_checksum(pyboy)
+    if log.rom_checksum is not None and log.rom_checksum != checksum:
+        log_msg("error", "replay.rom_mismatch", expected=hex(log.rom_checksum), actual=hex(checksum))
+        pyboy.stop(save=False)
+        return None
+    pyboy.set_emulation_speed(0)
+    # Igual que al empezar el log en vivo: todos los botones sueltos
+    Joypad(pyboy).reset()
+
+    # Eventos ordenados por frame; en un mismo frame el punto de control va
+    # antes que la entrada, igual que en el bucle (tick -> checkpoint -> decisión)
+    events = [(cp.frame, 0, cp) for cp in (log.checkpoints if verify else ())]
+    events += [(f, 1, m) for f, m in zip(log.frames, log.masks)]
+    events.sort(key=lambda e: (e[0], e[1]))
+
+    result = ReplayResult(frames=0, elapsed=0.0, checkpoints=0)
+    frame = 0
+    mask = 0
+    started = time.perf_counter()
+    try:
+        for target, kind, payload in events:
+            if target > frame:
+                pyboy.tick(target - frame, False)
+                frame = target
+            if kind == 0:
+                result.checkpoints += 1
+                actual = take_checkpoint(pyboy, frame)
+                if actual != payload:
+                    result.mismatches.append((payload, actual))
+                    log_msg("warning", "replay.checkpoint_mismatch", frame=frame,
+                           detail=payload.describe_mismatch(actual))
+                    if stop_on_mismatch:
+                        break
+            else:
+                apply_mask(pyboy, mask, payload)
+                mask = payload
+        else:
+            if log.end_frame > frame:
+                pyboy.tick(log.end_frame - frame, False)
+                frame = log.end_frame
+    finally:
+        result.elapsed = time.perf_counter() - started
+        result.frames = frame
+        pyboy.stop(save=False)
+
+    log_msg("info", "replay.finished", frames=result.frames, elapsed=f"{result.elapsed:.2f}",
+           fps=f"{result.fps:.0f}", checkpoints=result.checkpoints, mismatches=len(result.mismatches))
+    return result
@@ -0,0 +1,239 @@
+"""
+Telemetría local de las instancias del emulador en este proceso.
+
+Un servidor HTTP en 127.0.0.1 expone:
+    /metrics        formato de texto de Prometheus
+    /metrics.json   las mismas métricas en JSON, por instancia
+    /health         200 si todas las instancias vivas avanzan, 503 si alguna está atascada
+
+Las instancias se registran con `register()` y se guardan por referencia
+débil, así que un hilo terminado desaparece solo. La recolección solo lee
+atributos y contadores que el bucle ya mantiene; no toca el emulador.
+"""
+from __future__ import annotations
+import itertools
+import json
+import threading
+import time
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from config.logger_core import log_msg
+
+STALL_SECONDS = 10.0    # sin pasos nuevos durante este tiempo (y sin pausa) = atascada
+
+_ids = itertools.count(1)
+_instances: Dict[int, "weakref.ref"] = {}
+# Por instancia: (steps, instante de la medida, steps/s, instante del último avance)
+_rates: Dict[int, Tuple[int, float, float, float]] = {}
+_lock = threading.Lock()
+_servers: Dict[int, ThreadingHTTPServer] = {}
+
+
+def register(thread) -> int:
+    """Registra un EmulatorThread y devuelve su identificador de instancia."""
+    instance_id = next(_ids)
+    with _lock:
+        _instances[instance_id] = weakref.ref(thread)
+    return instance_id
+
+
+def unregister(instance_id: int) -> None:
+    with _lock:
+        _instances.pop(instance_id, None)
+        _rates.pop(instance_id, None)
+
+
+def _live_instances() -> List[Tuple[int, Any]]:
+    with _lock:
+        items = list(_instances.items())
+    out = []
+    for instance_id, ref in items:
+        thread = ref()
+        if thread is None:
+            unregister(instance_id)
+        else:
+            out.append((instance_id, thread))
+    return out
+
+
+def _rate(instance_id: int, steps: int, now: float) -> Tuple[float, float]:
+    """steps/s desde la recolección anterior y segundos desde el último avance."""
+    with _lock:
+        prev = _rates.get(instance_id)
+        if prev is None:
+            _rates[instance_id] = (steps, now, 0.0, now)
+            return 0.0, 0.0
+        last_steps, last_t, rate, last_progress = prev
+        if steps != last_steps:
+            last_progress = now
+        if now - last_t >= 0.5:
+            rate = max(0, steps - last_steps) / (now - last_t)
+            _rates[instance_id] = (steps, now, rate, last_progress)
+        else:
+            _rates[instance_id] = (last_steps, last_t, rate, last_progress)
+        return rate, now - last_progress
+
+
+def collect_instance(instance_id: int, thread) -> Dict[str, Any]:
+    now = time.monotonic()
+    steps = thread.steps_total
+    rate, idle = _rate(instance_id, steps, now)
+    alive = thread.is_alive()
+    paused = bool(getattr(thread, "paused", False))
+    coordinator = thread.coordinator
+    snapshot = coordinator.last_snapshot
+    explorer_stats = thread.explorer.get_stats()
+    counts = coordinator.context_counts
+    data: Dict[str, Any] = {
+        "instance": instance_id,
+        "rom": thread.rom_path,
+        "alive": alive,
+        "paused": paused,
+        "stalled": alive and not paused and idle >= STALL_SECONDS,
+        "speed": float(getattr(thread, "speed", 0.0)),
+        "episodes": thread.episodes,
+        "steps_total": steps,
+        "frames_total": thread.frames_total,
+        "steps_per_second": rate,
+        "seconds_since_progress": idle,
+        "context": coordinator.get_current_context().value,
+        "context_switches": coordinator.switch_count,
+        "context_switch_latency": coordinator.last_switch_latency,
+        "battles": counts.get("combat", 0),
+        "battle_turns": thread.combat.battle_turn_counter,
+        "in_battle": bool(snapshot.battle_flag) if snapshot else False,
+        "player_hp": snapshot.player_hp if snapshot else 0,
+        "enemy_hp": snapshot.enemy_hp if snapshot else 0,
+        "map_id": explorer_stats.get("map_id", 0),
+        "visited_positions": explorer_stats["visited_positions"],
+        "total_visits": explorer_stats["total_steps"],
+        "world_tiles": explorer_stats.get("world_tiles", 0),
+        "world_chunks": explorer_stats.get("world_chunks", 0),
+        "stuck_ticks": explorer_stats.get("stuck_ticks", 0),
+    }
+    if hasattr(thread, "get_profile_stats"):
+        data["phases_ewma_us"] = {name: st["ewma_us"] for name, st in thread.get_profile_stats().items()}
+    return data
+
+
+def collect() -> List[Dict[str, Any]]:
+    out = []
+    for instance_id, thread in _live_instances():
+        try:
+            out.append(collect_instance(instance_id, thread))
+        except Exception as e:
+            log_msg("warning", "telemetry.collect_error", instance=instance_id, error=str(e))
+    return out
+
+
+# (nombre, tipo, ayuda, clave en collect_instance)
+_METRICS = (
+    ("agentmon_up", "gauge", "1 si el hilo del emulador sigue vivo", "alive"),
+    ("agentmon_paused", "gauge", "1 si la instancia está en pausa", "paused"),
+    ("agentmon_stalled", "gauge", "1 si no avanza sin estar en pausa", "stalled"),
+    ("agentmon_speed", "gauge", "Multiplicador de velocidad (0 = sin límite)", "speed"),
+    ("agentmon_episodes_total", "counter", "Episodios iniciados", "episodes"),
+    ("agentmon_steps_total", "counter", "Decisiones del coordinador", "steps_total"),
+    ("agentmon_frames_total", "counter", "Frames emulados", "frames_total"),
+    ("agentmon_steps_per_second", "gauge", "Decisiones por segundo entre recolecciones", "steps_per_second"),
+    ("agentmon_seconds_since_progress", "gauge", "Segundos desde la última decisión observada",
+     "seconds_since_progress"),
+    ("agentmon_context_switches_total", "counter", "Cambios de contexto", "context_switches"),
+    ("agentmon_context_switch_latency_frames", "gauge",
+     "Frames entre el cambio en RAM y el último cambio de contexto", "context_switch_latency"),
+    ("agentmon_battles_total", "counter", "Entradas en combate", "battles"),
+    ("agentmon_battle_turns_total", "counter", "Acciones del agente de combate", "battle_turns"),
+    ("agentmon_in_battle", "gauge", "1 durante un combate", "in_battle"),
+    ("agentmon_player_hp", "gauge", "PS del Pokémon del jugador en combate", "player_hp"),
+    ("agentmon_enemy_hp", "gauge", "PS del Pokémon rival en combate", "enemy_hp"),
+    ("agentmon_map_id", "gauge", "Mapa actual", "map_id"),
+    ("agentmon_visited_tiles", "gauge", "Casillas distintas visitadas", "visited_positions"),
+    ("agentmon_visits_total", "counter", "Visitas registradas", "total_visits"),
+    ("agentmon_world_tiles", "gauge", "Casillas conocidas en el mapa del mundo", "world_tiles"),
+    ("agentmon_world_chunks", "gauge", "Chunks residentes del mapa del mundo", "world_chunks"),
+    ("agentmon_stuck_ticks", "gauge", "Pasos seguidos sin moverse", "stuck_ticks"),
+)
+
+
+def _label_value(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def render_prometheus(instances: Optional[List[Dict[str, Any]]] = None) -> str:
+    instances = collect() if instances is None else instances
+    lines: List[str] = []
+    for name, kind, help_text, key in _METRICS:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for inst in instances:
+            lines.append(f'{name}{{instance="{inst["instance"]}"}} {float(inst[key]):g}')
+    lines.append("# HELP agentmon_context Contexto de juego activo")
+    lines.append("# TYPE agentmon_context gauge")
+    for inst in instances:
+        lines.append(f'agentmon_context{{instance="{inst["instance"]}",'
+                     f'context="{_label_value(inst["context"])}"}} 1')
+    lines.append("# HELP agentmon_phase_ewma_microseconds Tiempo medio (EWMA) por fase del bucle")
+    lines.append("# TYPE agentmon_phase_ewma_microseconds gauge")
+    for inst in instances:
+        for phase, value in sorted(inst.get("phases_ewma_us", {}).items()):
+            lines.append(f'agentmon_phase_ewma_microseconds{{instance="{inst["instance"]}",'
+                         f'phase="{_label_value(phase)}"}} {value:g}')
+    return "\n".join(lines) + "\n"
+
+
+class _TelemetryHandler(BaseHTTPRequestHandler):
+    server_version = "AgentMonTelemetry/1.0"
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            self._send(200, render_prometheus(), "text/plain; version=0.0.4; charset=utf-8")
+        elif path == "/metrics.json":
+            body = json.dumps({"timestamp": time.time(), "instances": collect()})
+            self._send(200, body, "application/json")
+        elif path == "/health":
+            instances = collect()
+            ok = all(i["alive"] and not i["stalled"] for i in instances)
+            body = json.dumps({"ok": ok, "instances": len(instances)})
+            self._send(200 if ok else 503, body, "application/json")
+        else:
+            self._send(404, "not found\n", "text/plain")
+
+    def _send(self, status: int, body: str, content_type: str):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # las peticiones no van al log de la sesión
+
+
+def start_server(port: int, host: str = "127.0.0.1") -> Optional[ThreadingHTTPServer]:
+    """Arranca (una vez por puerto) el servidor de telemetría en un hilo daemon."""
+    with _lock:
+        server = _servers.get(port)
+        if server is not None:
+            return server
+        try:
+            server = ThreadingHTTPServer((host, port), _TelemetryHandler)
+        except OSError as e:
+            log_msg("error", "telemetry.start_error", port=port, error=str(e))
+            return None
+        server.daemon_threads = True
+        _servers[port] = server
+    threading.Thread(target=server.serve_forever, name=f"telemetry-{port}", daemon=True).start()
+    log_msg("info", "telemetry.started", host=host, port=server.server_address[1])
+    return server
+
+
+def stop_servers() -> None:
+    with _lock:
+        servers = list(_servers.values())
+        _servers.clear()
+    for server in servers:
+        server.shutdown()
+        server.server_close()
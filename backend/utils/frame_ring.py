@@ -0,0 +1,75 @@
+from __future__ import annotations
+import threading
+from typing import Optional, Tuple
+import numpy as np
+
+SCREEN_SHAPE: Tuple[int, int, int] = (144, 160, 4)   # RGBA, igual que pyboy.screen.ndarray
+
+
+class FrameRing:
+    """
+    Anillo de frames preasignado entre el hilo del emulador y la interfaz.
+
+    El productor copia cada frame una sola vez en el slot siguiente al último
+    publicado; el consumidor lee una vista del último slot completo sin
+    copiarlo. Cada slot guarda el número de secuencia del frame que contiene
+    (0 mientras se escribe), de modo que el lector puede comprobar con
+    `is_current()` que el productor no lo sobrescribió durante su uso.
+    `wait_for_new()` bloquea hasta que se publica un frame posterior.
+    """
+
+    def __init__(self, slots: int = 3, shape: Tuple[int, ...] = SCREEN_SHAPE,
+                 dtype=np.uint8):
+        if slots < 2:
+            raise ValueError("FrameRing necesita al menos 2 slots")
+        self.slots = slots
+        self.shape = tuple(shape)
+        self._frames = np.zeros((slots,) + self.shape, dtype=dtype)
+        self._slot_seq = [0] * slots
+        self._latest = -1
+        self.seq = 0
+        self._lock = threading.Lock()
+        self._new_frame = threading.Condition(self._lock)
+
+    def publish(self, frame: np.ndarray) -> int:
+        """Copia `frame` al siguiente slot y lo marca como el último completo."""
+        idx = (self._latest + 1) % self.slots
+        self._slot_seq[idx] = 0
+        np.copyto(self._frames[idx], frame, casting="no")
+        with self._lock:
+            self.seq += 1
+            self._slot_seq[idx] = self.seq
+            self._latest = idx
+            self._new_frame.notify_all()
+            return self.seq
+
+    def wait_for_new(self, last_seq: int, timeout: Optional[float] = None) -> int:
+        """Espera un frame con secuencia mayor que `last_seq`; devuelve la secuencia actual."""
+        with self._lock:
+            if self.seq <= last_seq:
+                self._new_frame.wait(timeout)
+            return self.seq
+
+    def wake(self) -> None:
+        """Despierta a los hilos bloqueados en `wait_for_new`."""
+        with self._lock:
+            self._new_frame.notify_all()
+
+    def latest(self) -> Tuple[int, Optional[np.ndarray]]:
+        """(seq, vista de solo lectura) del último frame completo; (0, None) si no hay."""
+        with self._lock:
+            idx, seq = self._latest, self.seq
+        if idx < 0:
+            return 0, None
+        view = self._frames[idx]
+        view.flags.writeable = False
+        return seq, view
+
+    def is_current(self, seq: int) -> bool:
+        """True si el frame `seq` sigue intacto en su slot."""
+        return seq > 0 and seq in self._slot_seq
+
+    def clear(self) -> None:
+        with self._lock:
+            self._slot_seq = [0] * self.slots
+            self._latest = -1
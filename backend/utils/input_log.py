@@ -0,0 +1,109 @@
+from __future__ import annotations
+import json
+import zlib
+from array import array
+from dataclasses import dataclass
+from typing import List, Optional
+import numpy as np
+from pyboy import PyBoy
+from backend.utils.ram_map import read_snapshot
+
+WRAM = (0xC000, 0xE000)
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    frame: int          # relativo al inicio del log
+    map_id: int
+    x: int
+    y: int
+    wram_crc: int
+
+    def describe_mismatch(self, other: "Checkpoint") -> str:
+        diffs = [f"{name}: {getattr(self, name)} != {getattr(other, name)}"
+                 for name in ("map_id", "x", "y", "wram_crc")
+                 if getattr(self, name) != getattr(other, name)]
+        return ", ".join(diffs)
+
+
+def take_checkpoint(pyboy: PyBoy, frame: int) -> Checkpoint:
+    snap = read_snapshot(pyboy)
+    wram = zlib.crc32(bytes(pyboy.memory[WRAM[0]:WRAM[1]]))
+    return Checkpoint(frame, snap.map_id, snap.player_x, snap.player_y, wram)
+
+
+class InputLog:
+    """
+    Estado de los botones frame a frame de un episodio, más lo necesario para
+    reproducirlo: el savestate inicial y puntos de control (posición y CRC de
+    la WRAM) para comprobar que la reproducción no diverge.
+
+    Solo se guardan los cambios: `frames[i]` es el frame (relativo al inicio)
+    desde el que está activa la máscara `masks[i]`. `rom_checksum` identifica
+    el cartucho con el que se grabó (None en logs antiguos).
+    """
+
+    def __init__(self, initial_state: bytes, base_frame: int, seed: Optional[int] = None,
+                 frames_per_decision: int = 1, rom_checksum: Optional[int] = None):
+        self.initial_state = initial_state
+        self.base_frame = base_frame
+        self.seed = seed
+        self.frames_per_decision = frames_per_decision
+        self.rom_checksum = rom_checksum
+        self.frames = array("I")
+        self.masks = array("B")
+        self.checkpoints: List[Checkpoint] = []
+        self.end_frame = 0
+
+    def record(self, frame_count: int, mask: int) -> None:
+        rel = frame_count - self.base_frame
+        # Varios cambios en el mismo frame: cuenta solo el último
+        if self.frames and self.frames[-1] == rel:
+            self.masks[-1] = mask
+        else:
+            self.frames.append(rel)
+            self.masks.append(mask)
+
+    def add_checkpoint(self, pyboy: PyBoy) -> Checkpoint:
+        cp = take_checkpoint(pyboy, pyboy.frame_count - self.base_frame)
+        self.checkpoints.append(cp)
+        return cp
+
+    def per_frame(self) -> np.ndarray:
+        """Máscara de cada frame hasta `end_frame`, expandida (uint8)."""
+        out = np.zeros(self.end_frame, dtype=np.uint8)
+        frames = np.frombuffer(self.frames, dtype=np.uint32).astype(np.int64)
+        masks = np.frombuffer(self.masks, dtype=np.uint8)
+        bounds = np.append(frames, self.end_frame)
+        for start, stop, mask in zip(bounds[:-1], bounds[1:], masks):
+            out[start:stop] = mask
+        return out
+
+    def save(self, path: str) -> None:
+        meta = {"base_frame": self.base_frame, "seed": self.seed,
+                "frames_per_decision": self.frames_per_decision, "end_frame": self.end_frame,
+                "rom_checksum": self.rom_checksum}
+        cps = np.array([(c.frame, c.map_id, c.x, c.y, c.wram_crc) for c in self.checkpoints],
+                       dtype=np.uint32).reshape(-1, 5)
+        # Con un archivo abierto numpy no añade ".npz": se guarda en `path` tal cual
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f,
+                frames=np.frombuffer(self.frames, dtype=np.uint32),
+                masks=np.frombuffer(self.masks, dtype=np.uint8),
+                checkpoints=cps,
+                state=np.frombuffer(self.initial_state, dtype=np.uint8),
+                meta=np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8),
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "InputLog":
+        with np.load(path) as data:
+            meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+            log = cls(data["state"].tobytes(), meta["base_frame"], meta.get("seed"),
+                      meta.get("frames_per_decision", 1), meta.get("rom_checksum"))
+            log.frames.frombytes(data["frames"].astype(np.uint32).tobytes())
+            log.masks.frombytes(data["masks"].astype(np.uint8).tobytes())
+            log.checkpoints = [Checkpoint(*map(int, row)) for row in data["checkpoints"]]
+        log.end_frame = meta.get("end_frame", 0)
+        return log
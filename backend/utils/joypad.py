@@ -0,0 +1,141 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+from pyboy import PyBoy
+
+BUTTONS: Tuple[str, ...] = ("a", "b", "select", "start", "right", "left", "up", "down")
+BUTTON_BITS: Dict[str, int] = {name: 1 << i for i, name in enumerate(BUTTONS)}
+DIRECTIONS: Tuple[str, ...] = ("up", "down", "left", "right")
+
+
+def buttons_to_mask(buttons: Iterable[str]) -> int:
+    mask = 0
+    for b in buttons:
+        mask |= BUTTON_BITS[b]
+    return mask
+
+
+def mask_to_buttons(mask: int) -> Tuple[str, ...]:
+    return tuple(b for b in BUTTONS if mask & BUTTON_BITS[b])
+
+
+def apply_mask(pyboy: PyBoy, old: int, new: int) -> None:
+    """Envía a PyBoy solo las transiciones de `old` a `new`."""
+    changed = old ^ new
+    if not changed:
+        return
+    for name, bit in BUTTON_BITS.items():
+        if changed & bit:
+            if new & bit:
+                pyboy.button_press(name)
+            else:
+                pyboy.button_release(name)
+
+
+class Joypad:
+    """
+    Estado de los botones compartido por los agentes.
+
+    Todas las pulsaciones pasan por aquí: se envían a PyBoy solo los cambios
+    y, si hay un `log` (InputLog), cada cambio se anota con el frame en el
+    que ocurre para poder reproducir la partida sin los agentes.
+    """
+
+    def __init__(self, pyboy: PyBoy, log=None):
+        self.pyboy = pyboy
+        self.mask = 0
+        self.log = log
+
+    def set_mask(self, mask: int) -> None:
+        if mask == self.mask:
+            return
+        apply_mask(self.pyboy, self.mask, mask)
+        self.mask = mask
+        if self.log is not None:
+            self.log.record(self.pyboy.frame_count, mask)
+
+    def set_buttons(self, buttons: Iterable[str]) -> None:
+        """Deja pulsados exactamente `buttons` y suelta el resto."""
+        self.set_mask(buttons_to_mask(buttons))
+
+    def press(self, button: str) -> None:
+        self.set_mask(self.mask | BUTTON_BITS[button])
+
+    def release(self, button: str) -> None:
+        self.set_mask(self.mask & ~BUTTON_BITS[button])
+
+    def release_all(self) -> None:
+        self.set_mask(0)
+
+    def reset(self, log=None) -> None:
+        """Suelta en PyBoy todos los botones (también los no registrados) y cambia de log."""
+        for name in BUTTONS:
+            self.pyboy.button_release(name)
+        self.mask = 0
+        self.log = log
+
+    @property
+    def pressed(self) -> Tuple[str, ...]:
+        return mask_to_buttons(self.mask)
+
+    def __repr__(self) -> str:
+        return f"Joypad({'+'.join(self.pressed) or '-'})"
+
+
+@dataclass
+class HoldTiming:
+    walk_frames: int = 17     # un paso andando son 16 frames; la posición cambia en el 17
+    button_frames: int = 2    # pulsación de a/b/start/select
+    button_gap: int = 6       # frames soltado tras un botón, para que la siguiente pulsación cuente
+
+    def for_action(self, action: str) -> Tuple[int, int]:
+        """(frames pulsado, frames soltado después) para `action`."""
+        if action in DIRECTIONS:
+            # Sin soltar: si la siguiente decisión repite dirección, se sigue andando
+            return self.walk_frames, 0
+        return self.button_frames, self.button_gap
+
+
+class InputScheduler:
+    """
+    Mantiene cada acción pulsada el tiempo que dura en el juego y avisa
+    cuando ha terminado.
+
+    `act()` pulsa la acción (vía Joypad, que solo envía los cambios) y
+    programa, si procede, su suelta; `ready()` se consulta en cada frame,
+    aplica la suelta pendiente y dice si ya se puede decidir la siguiente
+    acción. Así los agentes deciden una vez por paso y leen la posición
+    cuando el paso ya se ha dado.
+    """
+
+    def __init__(self, joypad: Joypad, timing: Optional[HoldTiming] = None):
+        self.joypad = joypad
+        self.timing = timing or HoldTiming()
+        self._release_at: Optional[int] = None
+        self._ready_at = 0
+        self.actions = 0
+
+    def ready(self) -> bool:
+        now = self.joypad.pyboy.frame_count
+        if self._release_at is not None and now >= self._release_at:
+            self.joypad.release_all()
+            self._release_at = None
+        return now >= self._ready_at
+
+    def hold(self, buttons: Iterable[str], frames: int, release_after: int = 0) -> None:
+        """Deja pulsados `buttons` durante `frames` y después, si `release_after`, los suelta ese tiempo."""
+        now = self.joypad.pyboy.frame_count
+        self.joypad.set_buttons(buttons)
+        self._release_at = now + frames if release_after > 0 else None
+        self._ready_at = now + frames + max(0, release_after)
+        self.actions += 1
+
+    def act(self, action: str) -> None:
+        frames, gap = self.timing.for_action(action)
+        self.hold((action,), frames, gap)
+
+    def cancel(self) -> None:
+        """Suelta todo y deja decidir ya (p. ej. al cambiar de contexto)."""
+        self.joypad.release_all()
+        self._release_at = None
+        self._ready_at = 0
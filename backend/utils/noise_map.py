@@ -19,63 +19,201 @@ class NoiseConfig:
     max_val: float = 255.0
     weights: InterestWeights = field(default_factory=InterestWeights)
 
+def _shift_inplace(a: np.ndarray, dr: int, dc: int):
+    rows, cols = a.shape
+    if abs(dr) >= rows or abs(dc) >= cols:
+        a.fill(0)
+        return
+    src = a[max(0, -dr):rows - max(0, dr), max(0, -dc):cols - max(0, dc)].copy()
+    a.fill(0)
+    a[max(0, dr):rows - max(0, -dr), max(0, dc):cols - max(0, -dc)] = src
+
+_INTEREST_KINDS = {"item": 1, "shop": 2, "heal": 3}
+
+# Códigos de `to_indexed_u8`: 0..INDEX_LEVELS-1 intensidad, luego bloqueado e intereses
+INDEX_LEVELS = 248
+INDEX_BLOCKED = INDEX_LEVELS
+INDEX_INTEREST = {kind: INDEX_BLOCKED + code for kind, code in _INTEREST_KINDS.items()}
+
 class NoiseVisitMap:
+    """
+    Mapa de ruido con decaimiento perezoso.
+
+    Los valores reales son `_raw * _scale`: `decay_all()` solo multiplica la
+    escala global y las celdas se tocan únicamente al leerlas o escribirlas.
+    Cuando la escala cae por debajo de `renorm_below` se vuelca sobre `_raw`.
+
+    `version` aumenta con cada modificación (incluido el decaimiento), para
+    que quien lo dibuja pueda saltarse los repintados sin cambios.
+    """
+
+    renorm_below = 1e-3
+
     def __init__(self, cfg: NoiseConfig = NoiseConfig()):
         self.cfg = cfg
-        self.grid = np.zeros((cfg.rows, cfg.cols), dtype=np.float32)
+        self._raw = np.zeros((cfg.rows, cfg.cols), dtype=np.float32)
+        self._scale = 1.0
         self.blocked = np.zeros((cfg.rows, cfg.cols), dtype=bool)
         self.interest_layer = np.zeros((cfg.rows, cfg.cols), dtype=np.uint8)
+        w = cfg.weights
+        self._interest_inc = {"item": w.item_inc, "shop": w.shop_inc, "heal": w.heal_inc}
+        self.version = 0
 
     def reset(self):
-        self.grid.fill(0.0)
+        self.version += 1
+        self._raw.fill(0.0)
+        self._scale = 1.0
         self.blocked.fill(False)
         self.interest_layer.fill(0)
 
+    @property
+    def grid(self) -> np.ndarray:
+        """Valores actuales ya decaídos (copia)."""
+        out = self._raw * np.float32(self._scale)
+        out[self.blocked] = 0.0
+        return out
+
     @property
     def shape(self) -> Tuple[int,int]:
-        return self.grid.shape
+        return self._raw.shape
 
     def in_bounds(self, r: int, c: int) -> bool:
         return 0 <= r < self.cfg.rows and 0 <= c < self.cfg.cols
 
+    def value_at(self, r: int, c: int) -> float:
+        if not (0 <= r < self.cfg.rows and 0 <= c < self.cfg.cols) or self.blocked[r, c]:
+            return 0.0
+        return float(self._raw[r, c]) * self._scale
+
+    def _renormalize(self):
+        self._raw *= np.float32(self._scale)
+        self._raw[self.blocked] = 0.0
+        self._scale = 1.0
+
+    def shift(self, dr: int, dc: int):
+        """Desplaza todas las capas (dr, dc) casillas; lo que entra por el borde queda en cero."""
+        if dr == 0 and dc == 0:
+            return
+        self.version += 1
+        for layer in (self._raw, self.blocked, self.interest_layer):
+            _shift_inplace(layer, dr, dc)
+
+    def load_window(self, values: np.ndarray, blocked: np.ndarray, interest: np.ndarray):
+        self.version += 1
+        np.clip(values, 0.0, self.cfg.max_val, out=self._raw, casting="unsafe")
+        self._scale = 1.0
+        self.blocked[...] = blocked
+        self.interest_layer[...] = interest
+        self._raw[self.blocked] = 0.0
+
     def decay_all(self):
-        self.grid *= self.cfg.decay
-        self.grid[self.blocked] = 0.0
+        self.version += 1
+        self._scale *= self.cfg.decay
+        if self._scale < self.renorm_below:
+            self._renormalize()
 
     def mark_blocked(self, r: int, c: int, flag: bool = True):
-        if self.in_bounds(r, c):
+        if 0 <= r < self.cfg.rows and 0 <= c < self.cfg.cols:
+            self.version += 1
             self.blocked[r, c] = flag
             if flag:
-                self.grid[r, c] = 0.0
+                self._raw[r, c] = 0.0
+
+    def _add(self, r: int, c: int, inc: float) -> bool:
+        if not (0 <= r < self.cfg.rows and 0 <= c < self.cfg.cols) or self.blocked[r, c]:
+            return False
+        raw = self._raw[r, c] + inc / self._scale
+        cap = self.cfg.max_val / self._scale
+        self._raw[r, c] = raw if raw < cap else cap
+        self.version += 1
+        return True
 
     def add_visit(self, r: int, c: int):
-        if self.in_bounds(r, c) and not self.blocked[r, c]:
-            self.grid[r, c] = min(self.cfg.max_val, self.grid[r, c] + self.cfg.weights.visit_inc)
+        self._add(r, c, self.cfg.weights.visit_inc)
 
     def add_interact(self, r: int, c: int):
-        if self.in_bounds(r, c) and not self.blocked[r, c]:
-            self.grid[r, c] = min(self.cfg.max_val, self.grid[r, c] + self.cfg.weights.interact_inc)
+        self._add(r, c, self.cfg.weights.interact_inc)
 
     def set_interest(self, r: int, c: int, kind: str):
-        if not self.in_bounds(r, c) or self.blocked[r, c]:
+        inc = self._interest_inc.get(kind, 0.0)
+        if inc > 0.0 and self._add(r, c, inc):
+            self.interest_layer[r, c] = _INTEREST_KINDS[kind]
+
+    # --- Actualizaciones por lotes -------------------------------------------------
+
+    def _valid_cells(self, rows, cols) -> Tuple[np.ndarray, np.ndarray]:
+        r = np.asarray(rows, dtype=np.intp).ravel()
+        c = np.asarray(cols, dtype=np.intp).ravel()
+        ok = (r >= 0) & (r < self.cfg.rows) & (c >= 0) & (c < self.cfg.cols)
+        r, c = r[ok], c[ok]
+        free = ~self.blocked[r, c]
+        return r[free], c[free]
+
+    def _add_many(self, r: np.ndarray, c: np.ndarray, inc) -> None:
+        if r.size == 0:
             return
-        if kind == "item":
-            inc, code = self.cfg.weights.item_inc, 1
-        elif kind == "shop":
-            inc, code = self.cfg.weights.shop_inc, 2
-        elif kind == "heal":
-            inc, code = self.cfg.weights.heal_inc, 3
-        else:
-            inc, code = 0.0, 0
-        if inc > 0.0:
-            self.grid[r, c] = min(self.cfg.max_val, self.grid[r, c] + inc)
-            self.interest_layer[r, c] = code
+        self.version += 1
+        # np.add.at acumula correctamente coordenadas repetidas
+        np.add.at(self._raw, (r, c), np.asarray(inc, dtype=np.float32) / np.float32(self._scale))
+        cap = np.float32(self.cfg.max_val / self._scale)
+        self._raw[r, c] = np.minimum(self._raw[r, c], cap)
+
+    def add_visits(self, rows, cols):
+        r, c = self._valid_cells(rows, cols)
+        self._add_many(r, c, self.cfg.weights.visit_inc)
+
+    def add_interacts(self, rows, cols):
+        r, c = self._valid_cells(rows, cols)
+        self._add_many(r, c, self.cfg.weights.interact_inc)
+
+    def set_interests(self, rows, cols, kinds):
+        r = np.asarray(rows, dtype=np.intp).ravel()
+        c = np.asarray(cols, dtype=np.intp).ravel()
+        k = np.broadcast_to(np.asarray(kinds), r.shape)
+        for kind, code in _INTEREST_KINDS.items():
+            sel = k == kind
+            if not sel.any():
+                continue
+            rr, cc = self._valid_cells(r[sel], c[sel])
+            self._add_many(rr, cc, self._interest_inc[kind])
+            self.interest_layer[rr, cc] = code
+            self.version += 1
+
+    def mark_blocked_many(self, rows, cols, flag: bool = True):
+        r = np.asarray(rows, dtype=np.intp).ravel()
+        c = np.asarray(cols, dtype=np.intp).ravel()
+        ok = (r >= 0) & (r < self.cfg.rows) & (c >= 0) & (c < self.cfg.cols)
+        r, c = r[ok], c[ok]
+        self.version += 1
+        self.blocked[r, c] = flag
+        if flag:
+            self._raw[r, c] = 0.0
+
+    # --- Lectura -------------------------------------------------------------------
 
     def to_grayscale_u8(self) -> np.ndarray:
-        norm = np.clip(self.grid, 0.0, self.cfg.max_val) / (self.cfg.max_val if self.cfg.max_val > 0 else 1.0)
-        gray = (255.0 - (norm * 255.0)).astype(np.uint8)
+        max_val = self.cfg.max_val if self.cfg.max_val > 0 else 1.0
+        tmp = self._raw * np.float32(255.0 * self._scale / max_val)
+        np.clip(tmp, 0.0, 255.0, out=tmp)
+        np.subtract(np.float32(255.0), tmp, out=tmp)
+        gray = tmp.astype(np.uint8)
         gray[self.blocked] = 255
         return gray
 
+    def to_indexed_u8(self) -> np.ndarray:
+        """
+        Una celda por byte para una imagen indexada: 0..INDEX_LEVELS-1 es la
+        intensidad del ruido, INDEX_BLOCKED las casillas bloqueadas e
+        INDEX_INTEREST[kind] las casillas con interés.
+        """
+        max_val = self.cfg.max_val if self.cfg.max_val > 0 else 1.0
+        tmp = self._raw * np.float32((INDEX_LEVELS - 1) * self._scale / max_val)
+        np.clip(tmp, 0.0, INDEX_LEVELS - 1, out=tmp)
+        idx = tmp.astype(np.uint8)
+        interest = self.interest_layer
+        np.add(interest, np.uint8(INDEX_BLOCKED), out=idx, where=interest > 0)
+        idx[self.blocked] = INDEX_BLOCKED
+        return idx
+
     def get_interest_mask(self) -> np.ndarray:
-        return self.interest_layer.copy()
\ No newline at end of file
+        return self.interest_layer.copy()
@@ -0,0 +1,88 @@
+from __future__ import annotations
+import zlib
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Deque
+import numpy as np
+
+
+def screen_key(tiles: np.ndarray) -> int:
+    """Hash de una vista de casillas (ObservationEncoder.tiles())."""
+    return zlib.crc32(np.ascontiguousarray(tiles))
+
+
+@dataclass
+class NoveltyConfig:
+    capacity: int = 4096        # pantallas distintas que se recuerdan (LRU)
+    history: int = 32           # últimas claves para detectar ciclos
+    max_period: int = 4         # ciclo más largo que se busca (1 = pantalla quieta, 2 = ir y volver)
+    repeats: int = 3            # vueltas completas para darlo por ciclo
+
+
+class NoveltyCache:
+    """
+    Pantallas vistas en cada decisión, con cuántas veces se ha visto cada
+    una, en un LRU acotado (OrderedDict: la menos reciente sale primero).
+
+    `observe()` anota una pantalla y devuelve sus apariciones, así que "ya
+    vi esto N veces" es inmediato. `loop_period()` mira las últimas claves:
+    periodo 1 es la misma pantalla repetida (texto esperando, menú, pared),
+    periodo 2 ir y volver entre dos casillas, y así hasta `max_period`.
+    """
+
+    def __init__(self, cfg: NoveltyConfig = NoveltyConfig()):
+        self.cfg = cfg
+        self._counts: "OrderedDict[int, int]" = OrderedDict()
+        self._recent: Deque[int] = deque(maxlen=max(cfg.history, cfg.max_period * cfg.repeats))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def observe(self, key: int) -> int:
+        counts = self._counts
+        count = counts.get(key, 0) + 1
+        if count > 1:
+            self.hits += 1
+            counts.move_to_end(key)
+        else:
+            self.misses += 1
+            if len(counts) >= self.cfg.capacity:
+                counts.popitem(last=False)
+                self.evictions += 1
+        counts[key] = count
+        self._recent.append(key)
+        return count
+
+    def count(self, key: int) -> int:
+        return self._counts.get(key, 0)
+
+    def novelty(self, key: int) -> float:
+        """1 para una pantalla nueva, decreciendo como 1/sqrt(apariciones)."""
+        return 1.0 / np.sqrt(max(1, self._counts.get(key, 0)))
+
+    def loop_period(self) -> int:
+        """Periodo del ciclo en que acaban las últimas claves; 0 si no hay."""
+        recent = self._recent
+        n = len(recent)
+        for period in range(1, self.cfg.max_period + 1):
+            span = period * self.cfg.repeats
+            if span > n:
+                break
+            if all(recent[n - 1 - i] == recent[n - 1 - i - period] for i in range(span - period)):
+                return period
+        return 0
+
+    def reset_history(self) -> None:
+        """Olvida la secuencia reciente (no los recuentos), p. ej. tras reaccionar a un ciclo."""
+        self._recent.clear()
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def get_stats(self) -> dict:
+        return {
+            "screens": len(self._counts),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,76 @@
+from __future__ import annotations
+from typing import Optional
+import numpy as np
+from pyboy import PyBoy
+from backend.utils.ram_map import RAM_MAP, TILEMAP, TILEMAP_COLS, TILEMAP_ROWS, rom_checksum, translate
+
+# wSpriteStateData1: 16 sprites de 16 bytes (sin desplazamiento en las versiones conocidas)
+SPRITE_STATE = 0xC100
+SPRITE_COUNT = 16
+SPRITE_HIDDEN = 0xFF            # imagen 0xFF: sprite fuera de pantalla u oculto
+SPRITE_BASE = 0x100             # códigos >= SPRITE_BASE: sprite (SPRITE_BASE + id del dibujo)
+
+OBSERVATION_SOURCES = ("wram", "game_area")
+
+
+class ObservationEncoder:
+    """
+    Vista de la pantalla a nivel de casilla: array (18, 20) uint16, unas 128
+    veces más pequeño que el frame RGBA.
+
+    Fuentes:
+      - "wram": wTileMap, la copia del fondo que mantiene el propio juego
+        (textos y menús incluidos), con los sprites visibles encima como
+        SPRITE_BASE + id del dibujo. Durante el combate no se superponen
+        sprites: los de wSpriteStateData1 son los del mapa.
+      - "game_area": `pyboy.game_area()`, lo que dibuja la PPU (índices de
+        tile 0..383, sprites incluidos). Unas diez veces más cara.
+
+    Se calcula solo cuando alguien la pide y se reutiliza durante el frame;
+    el array devuelto es de solo lectura.
+    """
+
+    def __init__(self, pyboy: PyBoy, source: str = "wram"):
+        if source not in OBSERVATION_SOURCES:
+            raise ValueError(f"fuente desconocida: {source} (disponibles: {', '.join(OBSERVATION_SOURCES)})")
+        self.pyboy = pyboy
+        self.source = source
+        self._battle_flag = translate(rom_checksum(pyboy), RAM_MAP["battle_flag"].address)
+        self._tiles = np.zeros((TILEMAP_ROWS, TILEMAP_COLS), dtype=np.uint16)
+        self._tiles.flags.writeable = False
+        self._frame: Optional[int] = None
+        self.computed = 0
+
+    @property
+    def shape(self):
+        return self._tiles.shape
+
+    def tiles(self) -> np.ndarray:
+        frame = self.pyboy.frame_count
+        if frame != self._frame:
+            self._frame = frame
+            tiles = self._read_game_area() if self.source == "game_area" else self._read_wram()
+            tiles.flags.writeable = False
+            self._tiles = tiles
+            self.computed += 1
+        return self._tiles
+
+    def _read_game_area(self) -> np.ndarray:
+        return self.pyboy.game_area().astype(np.uint16)
+
+    def _read_wram(self) -> np.ndarray:
+        mem = self.pyboy.memory
+        tiles = np.array(mem[TILEMAP:TILEMAP + TILEMAP_ROWS * TILEMAP_COLS],
+                         dtype=np.uint16).reshape(TILEMAP_ROWS, TILEMAP_COLS)
+        if mem[self._battle_flag]:
+            return tiles
+        state = mem[SPRITE_STATE:SPRITE_STATE + SPRITE_COUNT * 16]
+        for base in range(0, len(state), 16):
+            picture = state[base]
+            if picture == 0 or state[base + 2] == SPRITE_HIDDEN:
+                continue
+            # 16x16 píxeles dibujados 4 píxeles por encima de su casilla
+            row, col = (state[base + 4] + 4) // 8, state[base + 6] // 8
+            if 0 <= row < TILEMAP_ROWS - 1 and 0 <= col < TILEMAP_COLS - 1:
+                tiles[row:row + 2, col:col + 2] = SPRITE_BASE + picture
+        return tiles
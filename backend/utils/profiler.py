@@ -0,0 +1,118 @@
+from __future__ import annotations
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# Histograma logarítmico: 4 sub-buckets por potencia de 2 de nanosegundos
+_SUB_BITS = 2
+_SUB = 1 << _SUB_BITS
+_N_BUCKETS = 64 * _SUB
+
+
+def _bucket(ns: int) -> int:
+    bl = ns.bit_length()
+    if bl <= _SUB_BITS:
+        return ns
+    return (bl << _SUB_BITS) | ((ns >> (bl - _SUB_BITS - 1)) & (_SUB - 1))
+
+
+def _bucket_upper_ns(idx: int) -> float:
+    if idx < _SUB:
+        return float(idx + 1)
+    bl, sub = idx >> _SUB_BITS, idx & (_SUB - 1)
+    return float((_SUB + sub + 1) << (bl - _SUB_BITS - 1))
+
+
+class _PhaseStats:
+    __slots__ = ("count", "total_ns", "ewma_ns", "max_ns", "hist", "_since_halve")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.ewma_ns = 0.0
+        self.max_ns = 0
+        self.hist: List[int] = [0] * _N_BUCKETS
+        self._since_halve = 0
+
+
+class TickProfiler:
+    """
+    Tiempos por fase del bucle del emulador con histogramas móviles.
+
+    `add()` solo suma enteros en listas; cada `window` muestras de una fase
+    su histograma se divide a la mitad para que los percentiles reflejen la
+    actividad reciente.
+    """
+
+    def __init__(self, window: int = 4096, alpha: float = 0.02):
+        self.window = window
+        self.alpha = alpha
+        self._phases: Dict[str, _PhaseStats] = {}
+        self._lock = threading.Lock()
+        self.clock = time.perf_counter_ns
+
+    def add(self, phase: str, ns: int) -> None:
+        st = self._phases.get(phase)
+        if st is None:
+            with self._lock:
+                st = self._phases.setdefault(phase, _PhaseStats())
+        st.count += 1
+        st.total_ns += ns
+        st.ewma_ns += self.alpha * (ns - st.ewma_ns)
+        if ns > st.max_ns:
+            st.max_ns = ns
+        idx = _bucket(ns)
+        st.hist[idx if idx < _N_BUCKETS else _N_BUCKETS - 1] += 1
+        st._since_halve += 1
+        if st._since_halve >= self.window:
+            st.hist = [c >> 1 for c in st.hist]
+            st._since_halve = 0
+
+    @staticmethod
+    def _percentile(hist: List[int], q: float) -> float:
+        total = sum(hist)
+        if total == 0:
+            return 0.0
+        target = q * total
+        acc = 0
+        for idx, c in enumerate(hist):
+            acc += c
+            if acc >= target:
+                return _bucket_upper_ns(idx)
+        return _bucket_upper_ns(len(hist) - 1)
+
+    def get_stats(self, reference: str = "loop") -> Dict[str, Dict[str, Any]]:
+        """
+        Resumen por fase en microsegundos. `share` es la fracción del tiempo
+        de la fase `reference`; las fases anidadas se solapan entre sí.
+        """
+        with self._lock:
+            phases = dict(self._phases)
+        ref = phases.get(reference)
+        ref_total = ref.total_ns if ref and ref.total_ns else 0
+        out: Dict[str, Dict[str, Any]] = {}
+        for name, st in phases.items():
+            hist = list(st.hist)
+            out[name] = {
+                "count": st.count,
+                "mean_us": st.total_ns / st.count / 1000.0 if st.count else 0.0,
+                "ewma_us": st.ewma_ns / 1000.0,
+                "p50_us": self._percentile(hist, 0.50) / 1000.0,
+                "p95_us": self._percentile(hist, 0.95) / 1000.0,
+                "max_us": st.max_ns / 1000.0,
+                "share": st.total_ns / ref_total if ref_total else 0.0,
+            }
+        return out
+
+    def reset(self) -> None:
+        with self._lock:
+            self._phases.clear()
+
+
+def phase_start(profiler: Optional[TickProfiler]) -> int:
+    return profiler.clock() if profiler is not None else 0
+
+
+def phase_end(profiler: Optional[TickProfiler], phase: str, start: int) -> None:
+    if profiler is not None:
+        profiler.add(phase, profiler.clock() - start)
@@ -0,0 +1,192 @@
+from __future__ import annotations
+from dataclasses import dataclass, fields, replace
+from typing import Callable, Dict, Sequence, Tuple
+from pyboy import PyBoy
+
+
+def u8(raw: Sequence[int]) -> int:
+    return raw[0]
+
+
+def u16_be(raw: Sequence[int]) -> int:
+    return (raw[0] << 8) | raw[1]
+
+
+@dataclass(frozen=True)
+class RamField:
+    name: str
+    address: int
+    size: int = 1
+    decoder: Callable[[Sequence[int]], object] = u8
+    doc: str = ""
+
+    @property
+    def addresses(self) -> Tuple[int, ...]:
+        return tuple(range(self.address, self.address + self.size))
+
+
+# Direcciones de Pokémon Red (WRAM). Único lugar donde viven los números mágicos.
+RAM_FIELDS: Tuple[RamField, ...] = (
+    RamField("battle_flag", 0xD057, doc="wIsInBattle: 0 fuera de combate, 1 salvaje, 2 entrenador"),
+    RamField("menu_flag", 0xCC26, doc="wCurrentMenuItem"),
+    RamField("turn_flag", 0xCC3E),
+    RamField("map_id", 0xD35E, doc="wCurMap"),
+    RamField("player_y", 0xD361, doc="wYCoord"),
+    RamField("player_x", 0xD362, doc="wXCoord"),
+    RamField("facing", 0xC109, doc="Dirección del jugador (wSpriteStateData1): 0 abajo, 4 arriba, 8 izq., 0xC der."),
+    RamField("player_hp", 0xD015, size=2, decoder=u16_be, doc="wBattleMonHP"),
+    RamField("enemy_hp", 0xCFE6, size=2, decoder=u16_be, doc="wEnemyMonHP"),
+)
+
+RAM_MAP: Dict[str, RamField] = {f.name: f for f in RAM_FIELDS}
+
+# Valor de `facing` tras pulsar cada dirección (también si hay una pared delante)
+FACING: Dict[str, int] = {"down": 0x0, "up": 0x4, "left": 0x8, "right": 0xC}
+
+# Las direcciones de arriba son las de la versión americana. Otras versiones
+# desplazan tramos de la WRAM; se reconocen por la suma de comprobación global
+# de la cabecera (0x014E-0x014F). Tramos: (desde, hasta, desplazamiento).
+# Pokémon Rojo (España): desde los datos de combate (comprobado a partir de
+# wEnemyMon) todo va 5 bytes más adelante; los menús (0xCCxx) no se mueven.
+GLOBAL_CHECKSUM_ADDRESS = 0x014E
+RAM_SHIFTS: Dict[int, Tuple[Tuple[int, int, int], ...]] = {
+    0x384A: ((0xCFE5, 0xE000, 5),),     # Rojo (España)
+}
+
+
+@dataclass(frozen=True)
+class RamSnapshot:
+    """Valores decodificados de RAM_MAP leídos una sola vez por tick."""
+    battle_flag: int
+    menu_flag: int
+    turn_flag: int
+    map_id: int
+    player_y: int
+    player_x: int
+    facing: int
+    player_hp: int
+    enemy_hp: int
+
+    @property
+    def position(self) -> Tuple[int, int]:
+        return (self.player_x, self.player_y)
+
+
+if {f.name for f in fields(RamSnapshot)} != set(RAM_MAP):
+    raise RuntimeError("RamSnapshot y RAM_FIELDS no coinciden")
+
+
+def rom_checksum(pyboy: PyBoy) -> int:
+    mem = pyboy.memory
+    return (mem[GLOBAL_CHECKSUM_ADDRESS] << 8) | mem[GLOBAL_CHECKSUM_ADDRESS + 1]
+
+
+def translate(checksum: int, address: int) -> int:
+    """Dirección americana `address` en el cartucho `checksum`."""
+    for start, end, delta in RAM_SHIFTS.get(checksum, ()):
+        if start <= address < end:
+            return address + delta
+    return address
+
+
+def fields_for(checksum: int) -> Tuple[RamField, ...]:
+    """RAM_FIELDS con las direcciones propias del cartucho `checksum`."""
+    return tuple(replace(f, address=translate(checksum, f.address)) for f in RAM_FIELDS)
+
+
+# Plan de lectura precompilado por cartucho: cada dirección se lee una única vez.
+# Con PyBoy el acceso por índice es más barato que un slice, así que no se
+# agrupan rangos.
+_ReadPlan = Tuple[Tuple[int, ...], Tuple[Tuple[str, Callable, Tuple[int, ...]], ...]]
+_plans: Dict[int, _ReadPlan] = {}
+
+
+def _compile_plan(checksum: int) -> _ReadPlan:
+    ram_fields = fields_for(checksum)
+    addresses = tuple(sorted({a for f in ram_fields for a in f.addresses}))
+    decode = tuple(
+        (f.name, f.decoder, tuple(addresses.index(a) for a in f.addresses))
+        for f in ram_fields
+    )
+    _plans[checksum] = (addresses, decode)
+    return addresses, decode
+
+
+def read_snapshot(pyboy: PyBoy) -> RamSnapshot:
+    mem = pyboy.memory
+    checksum = rom_checksum(pyboy)
+    addresses, decode = _plans.get(checksum) or _compile_plan(checksum)
+    raw = [mem[a] for a in addresses]
+    return RamSnapshot(**{
+        name: decoder([raw[i] for i in idx]) for name, decoder, idx in decode
+    })
+
+
+# --- Combate -----------------------------------------------------------------
+# Estructuras wBattleMon / wEnemyMon (29 bytes): especie, PS, posición en el
+# equipo, estado, tipos, ratio de captura, movimientos, DVs, nivel, PS máximos,
+# estadísticas y PP.
+BATTLE_MON = 0xD014
+ENEMY_MON = 0xCFE5
+_MON_SIZE = 29
+
+# Menús (sin desplazamiento en las versiones conocidas) y copia del fondo en WRAM
+MENU_TOP_Y = 0xCC24             # wTopMenuItemY
+MENU_TOP_X = 0xCC25             # wTopMenuItemX
+MENU_ITEM = 0xCC26              # wCurrentMenuItem
+TILEMAP = 0xC3A0                # wTileMap, 20x18 casillas
+TILEMAP_ROWS, TILEMAP_COLS = 18, 20
+CURSOR_TILE = 0xED              # ▶
+
+
+@dataclass(frozen=True)
+class BattleMon:
+    species: int
+    hp: int
+    status: int
+    types: Tuple[int, int]
+    moves: Tuple[int, int, int, int]
+    level: int
+    max_hp: int
+    attack: int
+    defense: int
+    speed: int
+    special: int
+    pp: Tuple[int, int, int, int]     # sin los bits de PP extra
+
+
+def _decode_mon(raw: Sequence[int]) -> BattleMon:
+    def word(i: int) -> int:
+        return (raw[i] << 8) | raw[i + 1]
+    return BattleMon(
+        species=raw[0], hp=word(1), status=raw[4], types=(raw[5], raw[6]),
+        moves=tuple(raw[8:12]), level=raw[14], max_hp=word(15), attack=word(17),
+        defense=word(19), speed=word(21), special=word(23),
+        pp=tuple(p & 0x3F for p in raw[25:29]),
+    )
+
+
+def read_battle(pyboy: PyBoy) -> Tuple[BattleMon, BattleMon]:
+    """(Pokémon del jugador, Pokémon rival) del combate en curso."""
+    mem = pyboy.memory
+    checksum = rom_checksum(pyboy)
+    player = translate(checksum, BATTLE_MON)
+    enemy = translate(checksum, ENEMY_MON)
+    return (_decode_mon(mem[player:player + _MON_SIZE]),
+            _decode_mon(mem[enemy:enemy + _MON_SIZE]))
+
+
+def read_menu(pyboy: PyBoy) -> Tuple[int, int, int]:
+    """
+    (fila superior, columna, elemento actual) del último menú abierto. Siguen
+    en RAM al cerrarse el menú: para saber si está en pantalla hay que mirar
+    si el cursor está dibujado (`tile_at`).
+    """
+    mem = pyboy.memory
+    return mem[MENU_TOP_Y], mem[MENU_TOP_X], mem[MENU_ITEM]
+
+
+def tile_at(pyboy: PyBoy, row: int, col: int) -> int:
+    if not (0 <= row < TILEMAP_ROWS and 0 <= col < TILEMAP_COLS):
+        return 0
+    return pyboy.memory[TILEMAP + row * TILEMAP_COLS + col]
@@ -0,0 +1,135 @@
+from __future__ import annotations
+from array import array
+from typing import Dict, List, Tuple
+import numpy as np
+
+_EMPTY = 0xFFFFFFFF
+_FIB = 2654435761  # constante de hashing de Fibonacci para 32 bits
+
+
+def pack_tile(map_id: int, x: int, y: int) -> int:
+    return ((map_id & 0xFF) << 16) | ((y & 0xFF) << 8) | (x & 0xFF)
+
+
+def unpack_tile(key: int) -> Tuple[int, int, int]:
+    return (key >> 16) & 0xFF, key & 0xFF, (key >> 8) & 0xFF
+
+
+class VisitCounter:
+    """
+    Contador de visitas por casilla en una tabla hash de direccionamiento
+    abierto sobre arrays de enteros de 32 bits (8 bytes por entrada).
+
+    Los totales, el número de casillas únicas y el histograma de visitas
+    (`hist[b]` = casillas cuyo contador tiene `b` bits, es decir entre
+    2**(b-1) y 2**b - 1 visitas) se mantienen en cada `add()`.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        bits = max(4, (max(1, capacity) - 1).bit_length())
+        self._alloc(bits)
+        self.unique = 0
+        self.total = 0
+        self.hist: List[int] = [0] * 33
+
+    def _alloc(self, bits: int) -> None:
+        size = 1 << bits
+        self._bits = bits
+        self._shift = 32 - bits
+        self._mask = size - 1
+        self._keys = array("I", [_EMPTY]) * size
+        self._counts = array("I", [0]) * size
+
+    def __len__(self) -> int:
+        return self.unique
+
+    @property
+    def capacity(self) -> int:
+        return self._mask + 1
+
+    def _slot(self, key: int) -> int:
+        keys, mask = self._keys, self._mask
+        h = ((key * _FIB) & 0xFFFFFFFF) >> self._shift
+        while True:
+            k = keys[h]
+            if k == key or k == _EMPTY:
+                return h
+            h = (h + 1) & mask
+
+    def _grow(self) -> None:
+        old_keys, old_counts = self._keys, self._counts
+        self._alloc(self._bits + 1)
+        for k, c in zip(old_keys, old_counts):
+            if k != _EMPTY:
+                h = self._slot(k)
+                self._keys[h] = k
+                self._counts[h] = c
+
+    def add(self, map_id: int, x: int, y: int, inc: int = 1) -> int:
+        key = pack_tile(map_id, x, y)
+        h = self._slot(key)
+        old = self._counts[h]
+        if old == 0:
+            self._keys[h] = key
+            self.unique += 1
+        new = old + inc
+        self._counts[h] = new
+        self.total += inc
+        ob, nb = old.bit_length(), new.bit_length()
+        if ob != nb:
+            if ob:
+                self.hist[ob] -= 1
+            self.hist[nb] += 1
+        if self.unique * 2 > self._mask:
+            self._grow()
+        return new
+
+    def get(self, map_id: int, x: int, y: int) -> int:
+        return self._counts[self._slot(pack_tile(map_id, x, y))]
+
+    def _occupied(self) -> Tuple[np.ndarray, np.ndarray]:
+        keys = np.frombuffer(self._keys, dtype=np.uint32)
+        counts = np.frombuffer(self._counts, dtype=np.uint32)
+        used = keys != _EMPTY
+        return keys[used].copy(), counts[used].copy()
+
+    def most_visited(self, n: int = 10) -> List[Tuple[Tuple[int, int, int], int]]:
+        keys, counts = self._occupied()
+        order = np.argsort(counts)[::-1][:n]
+        return [(unpack_tile(int(keys[i])), int(counts[i])) for i in order]
+
+    def histogram(self) -> List[int]:
+        """`hist[1:]` sin los ceros finales: posición i = casillas con 2**i..2**(i+1)-1 visitas."""
+        last = max((b for b, v in enumerate(self.hist) if v), default=0)
+        return self.hist[1:last + 1]
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            "unique_tiles": self.unique,
+            "total_visits": self.total,
+            "visit_histogram": self.histogram(),
+        }
+
+    def save(self, path: str) -> None:
+        keys, counts = self._occupied()
+        # Con un archivo abierto numpy no añade ".npz": se guarda en `path` tal cual
+        with open(path, "wb") as f:
+            np.savez_compressed(f, keys=keys, counts=counts, total=np.int64(self.total))
+
+    @classmethod
+    def load(cls, path: str) -> "VisitCounter":
+        with np.load(path) as data:
+            keys = data["keys"].astype(np.uint32)
+            counts = data["counts"].astype(np.uint32)
+            total = int(data["total"])
+        vc = cls(capacity=max(16, len(keys) * 2 + 1))
+        for k, c in zip(keys.tolist(), counts.tolist()):
+            h = vc._slot(k)
+            vc._keys[h] = k
+            vc._counts[h] = c
+        vc.unique = len(keys)
+        vc.total = total
+        bits, freq = np.unique(np.frexp(counts.astype(np.float64))[1], return_counts=True)
+        for b, f in zip(bits.tolist(), freq.tolist()):
+            vc.hist[b] = f
+        return vc
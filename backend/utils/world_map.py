@@ -0,0 +1,154 @@
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Tuple
+import numpy as np
+
+ChunkKey = Tuple[int, int, int]
+
+
+@dataclass
+class WorldMapConfig:
+    chunk_bits: int = 4          # chunks de 16x16 casillas
+    max_chunks: int = 1024       # ~1.3 MB con las tres capas
+
+
+class _Chunk:
+    __slots__ = ("visits", "blocked", "interest")
+
+    def __init__(self, size: int):
+        self.visits = np.zeros((size, size), dtype=np.uint32)
+        self.blocked = np.zeros((size, size), dtype=bool)
+        self.interest = np.zeros((size, size), dtype=np.uint8)
+
+
+class WorldVisitMap:
+    """
+    Historial de visitas en coordenadas del mundo, indexado por (map_id, x, y).
+
+    Los datos viven en chunks cuadrados que se crean al primer acceso de
+    escritura; si se supera `max_chunks` se descarta el chunk usado hace más
+    tiempo. Las filas son `y` y las columnas `x`, igual que en NoiseVisitMap.
+    `unique_tiles` y `total_visits` cuentan solo los chunks en memoria (para
+    el total de la ejecución está VisitCounter).
+    """
+
+    def __init__(self, cfg: WorldMapConfig = WorldMapConfig()):
+        self.cfg = cfg
+        self.chunk_size = 1 << cfg.chunk_bits
+        self._mask = self.chunk_size - 1
+        self._chunks: "OrderedDict[ChunkKey, _Chunk]" = OrderedDict()
+        self.unique_tiles = 0
+        self.total_visits = 0
+        self.evicted_chunks = 0
+        # Aumenta cada vez que cambia alguna casilla bloqueada (para invalidar planes)
+        self.blocked_version = 0
+
+    def reset(self):
+        self._chunks.clear()
+        self.blocked_version += 1
+        self.unique_tiles = 0
+        self.total_visits = 0
+        self.evicted_chunks = 0
+
+    @property
+    def chunk_count(self) -> int:
+        return len(self._chunks)
+
+    def _key(self, map_id: int, x: int, y: int) -> ChunkKey:
+        bits = self.cfg.chunk_bits
+        return (map_id, x >> bits, y >> bits)
+
+    def _chunk(self, map_id: int, x: int, y: int, create: bool):
+        key = self._key(map_id, x, y)
+        chunk = self._chunks.get(key)
+        if chunk is not None:
+            self._chunks.move_to_end(key)
+            return chunk
+        if not create:
+            return None
+        chunk = _Chunk(self.chunk_size)
+        self._chunks[key] = chunk
+        if len(self._chunks) > self.cfg.max_chunks:
+            _, evicted = self._chunks.popitem(last=False)
+            # Lo descartado deja de contar: si se vuelve, sus casillas serán nuevas otra vez
+            self.unique_tiles -= int(np.count_nonzero(evicted.visits))
+            self.total_visits -= int(evicted.visits.sum())
+            self.evicted_chunks += 1
+            self.blocked_version += 1
+        return chunk
+
+    def add_visit(self, map_id: int, x: int, y: int, inc: int = 1) -> int:
+        chunk = self._chunk(map_id, x, y, create=True)
+        r, c = y & self._mask, x & self._mask
+        if chunk.visits[r, c] == 0:
+            self.unique_tiles += 1
+        chunk.visits[r, c] += inc
+        # Si el jugador está en la casilla, no puede estar bloqueada
+        if chunk.blocked[r, c]:
+            chunk.blocked[r, c] = False
+            self.blocked_version += 1
+        self.total_visits += inc
+        return int(chunk.visits[r, c])
+
+    def mark_blocked(self, map_id: int, x: int, y: int, flag: bool = True):
+        chunk = self._chunk(map_id, x, y, create=flag)
+        if chunk is not None:
+            r, c = y & self._mask, x & self._mask
+            if chunk.blocked[r, c] != flag:
+                chunk.blocked[r, c] = flag
+                self.blocked_version += 1
+
+    def set_interest(self, map_id: int, x: int, y: int, code: int):
+        chunk = self._chunk(map_id, x, y, create=True)
+        chunk.interest[y & self._mask, x & self._mask] = code
+
+    def visits_at(self, map_id: int, x: int, y: int) -> int:
+        chunk = self._chunks.get(self._key(map_id, x, y))
+        return int(chunk.visits[y & self._mask, x & self._mask]) if chunk is not None else 0
+
+    def is_blocked(self, map_id: int, x: int, y: int) -> bool:
+        chunk = self._chunks.get(self._key(map_id, x, y))
+        return bool(chunk.blocked[y & self._mask, x & self._mask]) if chunk is not None else False
+
+    def window(self, map_id: int, center: Tuple[int, int], rows: int, cols: int
+               ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Ventana (rows, cols) centrada en `center` = (x, y) como en NoiseVisitMap:
+        la casilla central es [rows // 2, cols // 2]. Devuelve visitas, bloqueos
+        e intereses; las zonas sin chunk quedan en cero.
+        """
+        cx, cy = center
+        x0, y0 = cx - cols // 2, cy - rows // 2
+        visits = np.zeros((rows, cols), dtype=np.uint32)
+        blocked = np.zeros((rows, cols), dtype=bool)
+        interest = np.zeros((rows, cols), dtype=np.uint8)
+        bits, size = self.cfg.chunk_bits, self.chunk_size
+        for ky in range(y0 >> bits, ((y0 + rows - 1) >> bits) + 1):
+            for kx in range(x0 >> bits, ((x0 + cols - 1) >> bits) + 1):
+                chunk = self._chunks.get((map_id, kx, ky))
+                if chunk is None:
+                    continue
+                # Intersección del chunk con la ventana, en coordenadas del mundo
+                wy0, wy1 = max(y0, ky * size), min(y0 + rows, (ky + 1) * size)
+                wx0, wx1 = max(x0, kx * size), min(x0 + cols, (kx + 1) * size)
+                dst = (slice(wy0 - y0, wy1 - y0), slice(wx0 - x0, wx1 - x0))
+                src = (slice(wy0 - ky * size, wy1 - ky * size), slice(wx0 - kx * size, wx1 - kx * size))
+                visits[dst] = chunk.visits[src]
+                blocked[dst] = chunk.blocked[src]
+                interest[dst] = chunk.interest[src]
+        return visits, blocked, interest
+
+    def coverage_by_map(self) -> Dict[int, int]:
+        out: Dict[int, int] = {}
+        for (map_id, _, _), chunk in self._chunks.items():
+            out[map_id] = out.get(map_id, 0) + int(np.count_nonzero(chunk.visits))
+        return out
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "unique_tiles": self.unique_tiles,
+            "total_visits": self.total_visits,
+            "chunks": len(self._chunks),
+            "evicted_chunks": self.evicted_chunks,
+        }
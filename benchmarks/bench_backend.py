@@ -0,0 +1,237 @@
+"""
+Benchmarks del backend sin interfaz contra el ROM incluido.
+
+Uso:
+    python -m benchmarks.bench_backend --save bench/baseline.json
+    python -m benchmarks.bench_backend --compare bench/baseline.json --threshold 0.10
+
+Con --compare el proceso termina con código 1 si alguna métrica empeora más
+que el umbral respecto al baseline.
+"""
+import argparse
+import dataclasses
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+warnings.filterwarnings("ignore", message="Using SDL2 binaries from pysdl2-dll")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import numpy as np
+
+from backend.emulator import EmulatorThread, RunConfig, create_agents, create_pyboy
+from backend.utils.noise_map import NoiseConfig, NoiseVisitMap
+from backend.utils.ram_map import read_snapshot
+from config.logger_core import flush_logging, get_log_listener, get_logger, log_msg
+
+DEFAULT_ROM = os.path.join("src", "resources", "pkm_red.gb")
+LOG_LEVELS = ("debug", "info", "warning", "error")
+
+Results = Dict[str, Dict[str, object]]
+
+
+def _result(results: Results, name: str, value: float, unit: str, higher_is_better: bool) -> None:
+    results[name] = {"value": float(value), "unit": unit, "higher_is_better": higher_is_better}
+
+
+def _latency(results: Results, name: str, samples_ns: List[int]) -> None:
+    arr = np.asarray(samples_ns, dtype=np.float64) / 1000.0
+    _result(results, f"{name}.mean_us", arr.mean(), "us", False)
+    _result(results, f"{name}.p50_us", np.percentile(arr, 50), "us", False)
+    _result(results, f"{name}.p95_us", np.percentile(arr, 95), "us", False)
+
+
+def _throughput(fn: Callable[[], None], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / max(time.perf_counter() - start, 1e-9)
+
+
+def bench_emulator_loop(results: Results, rom_path: str, steps: int) -> None:
+    # Ambos sin límite de velocidad: se mide el coste del render, no el ritmo de 59.7 Hz
+    for name, turbo, n in (("turbo", True, steps), ("render", False, max(100, steps // 10))):
+        pyboy = create_pyboy(rom_path)
+        cfg = RunConfig(max_steps=n, frames_per_decision=1, turbo=turbo, speed=0.0,
+                        log_frequency=n + 1, save_ram=False)
+        if turbo:
+            pyboy.set_emulation_speed(0)
+        thread = EmulatorThread(pyboy, rom_path, cfg)
+        start = time.perf_counter()
+        thread.emulator_loop()  # síncrono; detiene el PyBoy al terminar
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        _result(results, f"emulator_loop.{name}.steps_per_s", n / elapsed, "steps/s", True)
+
+
+def bench_agents(results: Results, rom_path: str, calls: int) -> None:
+    pyboy = create_pyboy(rom_path)
+    try:
+        coordinator, explorer, combat = create_agents(pyboy)
+        samples: Dict[str, List[int]] = {"meta_controller": [], "explorer": [], "combat": []}
+        clock = time.perf_counter_ns
+        for _ in range(calls):
+            pyboy.tick(1, False)
+            t0 = clock()
+            coordinator.step()
+            samples["meta_controller"].append(clock() - t0)
+
+            snapshot = read_snapshot(pyboy)
+            t0 = clock()
+            explorer.step(snapshot)
+            samples["explorer"].append(clock() - t0)
+
+            # Forzar el camino de decisión aunque el ROM no esté en combate
+            battle = dataclasses.replace(snapshot, battle_flag=1, turn_flag=1)
+            t0 = clock()
+            combat.step(battle)
+            samples["combat"].append(clock() - t0)
+        for name, values in samples.items():
+            _latency(results, f"{name}.step", values)
+    finally:
+        pyboy.stop(save=False)
+
+
+def bench_logging(results: Results, calls: int) -> None:
+    # Mide el coste en el hilo que llama; la escritura real va al hilo escritor,
+    # redirigido aquí a un archivo temporal en lugar del log de la sesión.
+    logger = get_logger()
+    listener = get_log_listener()
+    old_level = logger.level
+    old_handlers = listener.handlers if listener else ()
+    with tempfile.TemporaryDirectory() as tmp:
+        handler = logging.FileHandler(os.path.join(tmp, "bench.log"), encoding="utf-8")
+        if old_handlers:
+            handler.setFormatter(old_handlers[-1].formatter)
+        if listener:
+            listener.handlers = (handler,)
+        try:
+            for enabled_level in (logging.DEBUG, logging.INFO):
+                logger.setLevel(enabled_level)
+                handler.setLevel(enabled_level)
+                suffix = logging.getLevelName(enabled_level).lower()
+                for level in LOG_LEVELS:
+                    samples = []
+                    for i in range(calls):
+                        t0 = time.perf_counter_ns()
+                        log_msg(level, "explorer.moved", from_pos=(i, 0), to_pos=(i, 1),
+                                action="up", grid_pos=(7, 10))
+                        samples.append(time.perf_counter_ns() - t0)
+                    arr = np.asarray(samples, dtype=np.float64) / 1000.0
+                    _result(results, f"log_msg.{level}@{suffix}.mean_us", arr.mean(), "us", False)
+        finally:
+            flush_logging()
+            if listener:
+                listener.handlers = old_handlers
+            handler.close()
+            logger.setLevel(old_level)
+
+
+def bench_noise_map(results: Results, iterations: int) -> None:
+    rng = np.random.default_rng(0)
+    for rows, cols in ((15, 20), (256, 256)):
+        noise = NoiseVisitMap(NoiseConfig(rows=rows, cols=cols))
+        cells = rng.integers(0, [rows, cols], size=(iterations, 2))
+        noise.blocked[rng.random((rows, cols)) < 0.05] = True
+        tag = f"noise_map.{rows}x{cols}"
+        _result(results, f"{tag}.decay_all.ops_per_s", _throughput(noise.decay_all, iterations), "ops/s", True)
+        it = iter(cells)
+        _result(results, f"{tag}.add_visit.ops_per_s",
+                _throughput(lambda: noise.add_visit(*next(it)), iterations), "ops/s", True)
+        n_batches = iterations // 64
+        if n_batches:
+            batch = iter(cells[:n_batches * 64].reshape(n_batches, 64, 2))
+            _result(results, f"{tag}.add_visits_x64.ops_per_s",
+                    _throughput(lambda: noise.add_visits(*next(batch).T), n_batches), "ops/s", True)
+        _result(results, f"{tag}.to_grayscale_u8.ops_per_s",
+                _throughput(noise.to_grayscale_u8, max(1, iterations // 10)), "ops/s", True)
+
+
+def compare(current: Results, baseline: Results, threshold: float) -> List[str]:
+    regressions = []
+    print(f"{'métrica':58} {'baseline':>12} {'actual':>12} {'cambio':>9}")
+    for name, cur in sorted(current.items()):
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:58} {'-':>12} {cur['value']:>12.2f} {'nuevo':>9}")
+            continue
+        b, c = float(base["value"]), float(cur["value"])
+        if b == 0:
+            continue
+        change = (c - b) / b
+        worse = -change if cur["higher_is_better"] else change
+        mark = " <-- regresión" if worse > threshold else ""
+        if mark:
+            regressions.append(name)
+        print(f"{name:58} {b:>12.2f} {c:>12.2f} {change:>+8.1%}{mark}")
+    return regressions
+
+
+def run(quick: bool, rom_path: str, only: Optional[List[str]] = None) -> Results:
+    scale = 10 if quick else 1
+    suites = {
+        "emulator_loop": lambda r: bench_emulator_loop(r, rom_path, 20000 // scale),
+        "agents": lambda r: bench_agents(r, rom_path, 5000 // scale),
+        "logging": lambda r: bench_logging(r, 5000 // scale),
+        "noise_map": lambda r: bench_noise_map(r, 20000 // scale),
+    }
+    results: Results = {}
+    for name, suite in suites.items():
+        if only and name not in only:
+            continue
+        suite(results)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="bench_backend")
+    parser.add_argument("--rom", default=os.getenv("ROM_PATH") or DEFAULT_ROM)
+    parser.add_argument("--save", help="Escribe los resultados en este archivo JSON")
+    parser.add_argument("--compare", help="Baseline JSON contra el que comparar")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Empeoramiento relativo tolerado antes de marcar regresión")
+    parser.add_argument("--quick", action="store_true", help="Menos iteraciones")
+    parser.add_argument("--only", nargs="*", help="Suites a ejecutar")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.rom):
+        print(f"ROM no encontrado: {args.rom}", file=sys.stderr)
+        return 2
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "quick": args.quick,
+        },
+        "results": run(args.quick, args.rom, args.only),
+    }
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(report["results"], baseline, args.threshold)
+        return 1 if regressions else 0
+
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
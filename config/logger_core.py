@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import atexit
 import logging
 import os
+import queue
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any, Optional
 
 from dotenv import load_dotenv
@@ -11,6 +14,15 @@ from .messages import get_message, load_messages
 
 _LOGGER: Optional[logging.Logger] = None
 _LOG_FILE_PATH: Optional[str] = None
+_LISTENER: Optional[QueueListener] = None
+
+_LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+    "critical": logging.CRITICAL,
+}
 
 def _ensure_logs_dir(logs_dir: str = "./logs") -> str:
     os.makedirs(logs_dir, exist_ok=True)
@@ -28,8 +40,45 @@ def _file_formatter() -> logging.Formatter:
     datefmt = "%d-%m-%Y %H:%M:%S"
     return logging.Formatter(fmt=fmt, datefmt=datefmt)
 
+class _AsyncQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # log_msg ya entrega el mensaje formateado; el formato de línea
+        # (fecha, nivel, colores) lo aplica el hilo escritor.
+        return record
+
+def _start_listener(logger: logging.Logger) -> QueueListener:
+    handlers = list(logger.handlers)
+    for h in handlers:
+        logger.removeHandler(h)
+    q: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    logger.addHandler(_AsyncQueueHandler(q))
+    listener = QueueListener(q, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(shutdown_logging)
+    return listener
+
+def shutdown_logging() -> None:
+    """Vacía la cola y detiene el hilo escritor."""
+    global _LISTENER
+    if _LISTENER is not None:
+        _LISTENER.stop()
+        for h in _LISTENER.handlers:
+            h.flush()
+        _LISTENER = None
+
+def flush_logging() -> None:
+    """Espera a que el hilo escritor vacíe la cola y lo vuelve a arrancar."""
+    if _LISTENER is not None:
+        _LISTENER.stop()
+        for h in _LISTENER.handlers:
+            h.flush()
+        _LISTENER.start()
+
+def get_log_listener() -> Optional[QueueListener]:
+    return _LISTENER
+
 def get_logger() -> logging.Logger:
-    global _LOGGER, _LOG_FILE_PATH
+    global _LOGGER, _LOG_FILE_PATH, _LISTENER
     if _LOGGER is not None:
         return _LOGGER
 
@@ -49,6 +98,9 @@ def get_logger() -> logging.Logger:
     fh.setFormatter(_file_formatter())
     logger.addHandler(fh)
 
+    # Consola y archivo se escriben desde un hilo aparte para no bloquear al emulador
+    _LISTENER = _start_listener(logger)
+
     _LOGGER = logger
     return logger
 
@@ -63,18 +115,9 @@ def format_message(key: str, **kwargs: Any) -> str:
         return f"{template} | {kwargs}"
 
 def log_msg(level: str, key: str, **kwargs: Any) -> None:
-    logger = get_logger()
-    msg = format_message(key, **kwargs)
-    lvl = level.lower()
-    if lvl == "debug":
-        logger.debug(msg)
-    elif lvl == "info":
-        logger.info(msg)
-    elif lvl == "warning":
-        logger.warning(msg)
-    elif lvl == "error":
-        logger.error(msg)
-    elif lvl == "critical":
-        logger.critical(msg)
-    else:
-        logger.info(msg)
\ No newline at end of file
+    logger = _LOGGER or get_logger()
+    lvl = _LEVELS.get(level) or _LEVELS.get(level.lower(), logging.INFO)
+    # Sin formatear ni encolar nada si el nivel está deshabilitado
+    if not logger.isEnabledFor(lvl):
+        return
+    logger.log(lvl, format_message(key, **kwargs))
\ No newline at end of file
@@ -1,13 +1,85 @@
 import sys
 import os
+import argparse
 import warnings
 from config.logger_core import get_logger, log_msg, get_log_file_path
 
 warnings.filterwarnings("ignore", message="Using SDL2 binaries from pysdl2-dll")
 
-def run_console():
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="agentmon")
+    parser.add_argument("--console", action="store_true",
+                        help="Ejecuta sin interfaz gráfica")
+    parser.add_argument("--turbo", action="store_true", default=None,
+                        help="Sin render ni espera: velocidad máxima del emulador")
+    parser.add_argument("--speed", type=float, default=None,
+                        help="Velocidad respecto al tiempo real de la Game Boy (1 = 59.7 Hz, 0 = sin límite)")
+    parser.add_argument("--max-steps", type=int, default=None,
+                        help="Decisiones del coordinador antes de detenerse (0 = sin límite)")
+    parser.add_argument("--frame-skip", type=int, default=None,
+                        help="Frames emulados por cada decisión de los agentes")
+    parser.add_argument("--boot-state-at", default=None,
+                        help="Punto de captura del savestate de arranque: boot, overworld o frames:N")
+    parser.add_argument("--visits", default=None,
+                        help="Archivo .npz de estadísticas de visitas a cargar al iniciar y guardar al terminar")
+    parser.add_argument("--record", default=None, metavar="RUTA",
+                        help="Graba frames, acciones y contexto en un archivo .agmrec")
+    parser.add_argument("--record-every", type=int, default=None,
+                        help="Graba uno de cada N pasos")
+    parser.add_argument("--telemetry-port", type=int, default=None,
+                        help="Sirve métricas en http://127.0.0.1:PUERTO/metrics (0 = desactivado)")
+    parser.add_argument("--explorer-mode", choices=("random", "frontier", "qlearning", "sarsa"), default=None,
+                        help="Política del explorador: paseo aleatorio, planificación por fronteras "
+                             "o aprendizaje tabular (Q-learning / SARSA)")
+    parser.add_argument("--q-table", default=None, metavar="RUTA",
+                        help="Tabla Q (.npz) a cargar al empezar y guardar al terminar")
+    parser.add_argument("--context-polling", dest="context_hooks", action="store_const", const=False,
+                        default=None, help="Detecta los cambios de contexto sondeando la RAM, sin hooks")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Semilla de los agentes (por defecto aleatoria, se anota en el log)")
+    parser.add_argument("--input-log", default=None, metavar="RUTA",
+                        help="Guarda los botones frame a frame en un .npz reproducible")
+    parser.add_argument("--replay", default=None, metavar="RUTA",
+                        help="Reproduce un input log sin agentes ni render y comprueba sus puntos de control")
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+def build_run_config(args):
+    from backend.emulator import RunConfig
+
+    cfg = RunConfig.from_env()
+    if args.turbo is not None:
+        cfg.turbo = args.turbo
+    if args.speed is not None:
+        cfg.speed = max(0.0, args.speed)
+    if args.max_steps is not None:
+        cfg.max_steps = args.max_steps
+    if args.frame_skip is not None:
+        cfg.frames_per_decision = max(1, args.frame_skip)
+    if args.boot_state_at is not None:
+        cfg.boot_state_at = args.boot_state_at.strip().lower()
+    if args.visits is not None:
+        cfg.visits_path = args.visits
+    if args.record is not None:
+        cfg.record_path = args.record
+    if args.record_every is not None:
+        cfg.record_every = max(1, args.record_every)
+    if args.telemetry_port is not None:
+        cfg.telemetry_port = args.telemetry_port
+    if args.explorer_mode is not None:
+        cfg.explorer_mode = args.explorer_mode
+    if args.context_hooks is not None:
+        cfg.context_hooks = args.context_hooks
+    if args.q_table is not None:
+        cfg.q_table_path = args.q_table
+    if args.seed is not None:
+        cfg.seed = args.seed
+    if args.input_log is not None:
+        cfg.input_log_path = args.input_log
+    return cfg
+
+def run_console(args):
     from backend.emulator import run_pyboy_threaded
-    import threading
     
     logger = get_logger()
     log_msg("info", "system.ready")
@@ -16,7 +88,7 @@ def run_console():
     os.environ['SDL_VIDEODRIVER'] = 'dummy'
     os.environ['SDL_AUDIODRIVER'] = 'dummy'
     
-    pyboy, thread = run_pyboy_threaded()
+    pyboy, thread = run_pyboy_threaded(build_run_config(args))
     if pyboy and thread:
         try:
             thread.join()
@@ -27,6 +99,26 @@ def run_console():
     else:
         log_msg("error", "system.failed_to_start")
 
+def run_replay(args):
+    from backend.replay import replay
+    from backend.utils.input_log import InputLog
+
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
+    try:
+        log = InputLog.load(args.replay)
+    except Exception as e:
+        log_msg("error", "replay.load_error", path=args.replay, error=str(e))
+        return 1
+    rom_path = os.getenv('ROM_PATH')
+    if not rom_path or not os.path.exists(rom_path):
+        log_msg("error", "emulator.rom_not_found", rom_path=rom_path)
+        return 1
+    log_msg("info", "replay.started", path=args.replay)
+    result = replay(rom_path, log)
+    return 0 if result is not None and result.ok else 1
+
 def run_interface():
     from PySide6.QtWidgets import QApplication
     from ui.main_window import MainWindow
@@ -56,7 +148,10 @@ def run_interface():
         return 0
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1 and sys.argv[1] == "--console":
-        run_console()
+    args = parse_args(sys.argv[1:])
+    if args.replay:
+        sys.exit(run_replay(args))
+    elif args.console:
+        run_console(args)
     else:
         sys.exit(run_interface())
\ No newline at end of file
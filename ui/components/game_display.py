@@ -2,32 +2,55 @@ from PySide6.QtWidgets import QLabel, QVBoxLayout, QWidget
 from PySide6.QtCore import QTimer, QThread, Signal, Qt, QSize
 from PySide6.QtGui import QImage, QPixmap
 from typing import Optional
-import numpy as np
 from pyboy import PyBoy
+from backend.utils.frame_ring import FrameRing
 from ui.utils.frame_buffer import FrameBuffer
 from config.logger_core import log_msg
 
 
 class GameDisplayThread(QThread):
-    frame_ready = Signal(np.ndarray)
-
-    def __init__(self, pyboy: PyBoy):
+    """
+    Avisa con el número de secuencia cuando hay un frame nuevo en el FrameRing.
+    Duerme sobre el anillo hasta que el emulador publica, así que en pausa no
+    consume CPU. Si el emulador no publica frames (`capture=True`), copia
+    `pyboy.screen` al anillo solo cuando avanza `pyboy.frame_count`.
+    """
+    frame_ready = Signal(int)
+
+    def __init__(self, pyboy: PyBoy, ring: FrameRing, capture: bool = False, max_fps: int = 30):
         super().__init__()
         self.pyboy = pyboy
+        self.ring = ring
+        self.capture = capture
+        self.min_interval_ms = max(1, int(1000 / max_fps))
         self._running = False
 
     def run(self):
         self._running = True
+        last_seq = 0
+        last_frame = -1
         log_msg("info", "display.thread_started")
         while self._running:
             try:
-                if self.pyboy and hasattr(self.pyboy, "screen"):
-                    arr = self.pyboy.screen.ndarray
-                    if arr is not None and arr.size > 0:
-                        self.frame_ready.emit(arr.copy())
+                if self.capture:
+                    if not (self.pyboy and hasattr(self.pyboy, "screen")):
+                        break
+                    frame = self.pyboy.frame_count
+                    if frame != last_frame:
+                        last_frame = frame
+                        self.ring.publish(self.pyboy.screen.ndarray)
+                    seq = self.ring.seq
+                    if seq == last_seq:
+                        self.msleep(self.min_interval_ms)
+                        continue
                 else:
-                    break
-                self.msleep(33)
+                    seq = self.ring.wait_for_new(last_seq, timeout=0.5)
+                    if seq == last_seq:
+                        continue
+                last_seq = seq
+                self.frame_ready.emit(seq)
+                # No avisar más rápido de lo que la interfaz pinta
+                self.msleep(self.min_interval_ms)
             except Exception as e:
                 log_msg("error", "display.frame_capture_error", error=str(e))
                 break
@@ -35,6 +58,7 @@ class GameDisplayThread(QThread):
 
     def stop(self):
         self._running = False
+        self.ring.wake()
         self.quit()
         self.wait(3000)
 
@@ -46,9 +70,9 @@ class GameDisplay(QWidget):
         self.frame_buffer = FrameBuffer(target_fps=30)
         self.capture_thread: Optional[GameDisplayThread] = None
         self.has_frame = False
+        self._shown_seq = 0
 
         self.setup_ui()
-        self.setup_timer()
 
     def setup_ui(self):
         layout = QVBoxLayout(self)
@@ -70,51 +94,46 @@ class GameDisplay(QWidget):
 
         layout.addWidget(self.game_label)
 
-    def setup_timer(self):
-        self.display_timer = QTimer(self)
-        self.display_timer.timeout.connect(self.update_display)
-        self.display_timer.start(33)  # ~30 FPS
-
-    def connect_emulator(self, pyboy: PyBoy):
+    def connect_emulator(self, pyboy: PyBoy, frame_ring: Optional[FrameRing] = None):
         self.pyboy = pyboy
         self.game_label.setText("")
         self.has_frame = False
 
-        self.capture_thread = GameDisplayThread(pyboy)
+        # Sin anillo del emulador se crea uno local y el hilo de captura lo llena
+        ring = frame_ring or FrameRing()
+        self.frame_buffer.attach_ring(ring)
+        self._shown_seq = 0
+        self.capture_thread = GameDisplayThread(pyboy, ring, capture=frame_ring is None,
+                                                max_fps=self.frame_buffer.target_fps)
         self.capture_thread.frame_ready.connect(self.on_frame_received)
         self.capture_thread.start()
 
         log_msg("info", "display.emulator_connected")
 
-    def on_frame_received(self, frame: np.ndarray):
-        try:
-            if frame is not None and frame.size > 0:
-                self.frame_buffer.add_frame(frame)
-                if not self.has_frame:
-                    self.frame_buffer.add_frame(frame)
-                    self.has_frame = True
-                    if self.game_label.text():
-                        self.game_label.setText("")
-        except Exception as e:
-            log_msg("error", "display.frame_receive_error", error=str(e))
+    def on_frame_received(self, seq: int):
+        self.frame_buffer.mark_delivered()
+        if not self.has_frame:
+            self.has_frame = True
+            if self.game_label.text():
+                self.game_label.setText("")
+        self.update_display()
+        if self._shown_seq != seq:
+            # El límite de FrameBuffer rechazó el frame: reintentar para no quedarse
+            # con uno antiguo si el emulador deja de publicar (pausa, fin)
+            QTimer.singleShot(int(self.frame_buffer.frame_time * 1000), self.update_display)
 
     def update_display(self):
-        current_frame = self.frame_buffer.get_current_frame()
-        if current_frame is None:
+        frame = self.frame_buffer.get_current_frame()
+        # Mismo frame que el ya escalado: el pixmap del label sigue siendo válido
+        if frame is None or self.frame_buffer.current_seq == self._shown_seq:
             return
 
         try:
-            frame = np.ascontiguousarray(current_frame)
-            if frame.ndim != 3:
+            if frame.ndim != 3 or frame.shape[2] != 4:
                 return
-            h, w, c = frame.shape
-            if c == 4:
-                frame = frame[:, :, :3]
-            elif c != 3:
-                return
-
-            bpl = 3 * w
-            qimg = QImage(frame.data.tobytes(), w, h, bpl, QImage.Format.Format_RGB888)
+            h, w, _ = frame.shape
+            # QImage envuelve el slot del anillo sin copiarlo; fromImage hace la única copia
+            qimg = QImage(frame.data, w, h, frame.strides[0], QImage.Format.Format_RGBA8888)
             if qimg.isNull():
                 return
 
@@ -123,7 +142,13 @@ class GameDisplay(QWidget):
                 Qt.AspectRatioMode.KeepAspectRatio,
                 Qt.TransformationMode.SmoothTransformation
             )
+            # Si el productor reutilizó el slot mientras se convertía, el frame puede estar mezclado
+            if not self.frame_buffer.is_current_valid():
+                self.frame_buffer.mark_dropped()
+                return
             self.game_label.setPixmap(pm)
+            self._shown_seq = self.frame_buffer.current_seq
+            self.frame_buffer.mark_displayed()
 
         except Exception as e:
             cnt = getattr(self, "_errcnt", 0) + 1
@@ -136,6 +161,7 @@ class GameDisplay(QWidget):
             self.capture_thread.stop()
             self.capture_thread = None
 
+        self.frame_buffer.attach_ring(None)
         self.frame_buffer.clear()
         self.pyboy = None
         self.game_label.clear()
@@ -1,5 +1,5 @@
 from PySide6.QtWidgets import QMenuBar, QWidget, QMessageBox
-from PySide6.QtGui import QAction, QKeySequence
+from PySide6.QtGui import QAction, QActionGroup, QKeySequence
 from PySide6.QtCore import Signal
 from config.logger_core import log_msg
 
@@ -8,11 +8,20 @@ class GameMenuBar(QMenuBar):
     start_requested = Signal()
     restart_requested = Signal()
     pause_requested = Signal()
+    resume_requested = Signal()
+    step_requested = Signal()
+    speed_changed = Signal(float)
+    record_toggled = Signal(bool)
+
+    # (etiqueta, multiplicador sobre el tiempo real); 0 = sin límite
+    SPEEDS = (("0.25x", 0.25), ("0.5x", 0.5), ("1x (tiempo real)", 1.0),
+              ("2x", 2.0), ("4x", 4.0), ("8x", 8.0), ("Sin límite", 0.0))
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.is_running = False
         self.is_paused = False
+        self.speed = 1.0
         self.setup_menus()
 
     def setup_menus(self):
@@ -31,10 +40,35 @@ class GameMenuBar(QMenuBar):
 
         self.pause_action = QAction("&Pausar", self)
         self.pause_action.setShortcut(QKeySequence("Space"))
+        self.pause_action.setCheckable(True)
         self.pause_action.triggered.connect(self.on_pause_clicked)
         self.pause_action.setEnabled(False)
         m.addAction(self.pause_action)
 
+        self.step_action = QAction("Avanzar un &paso", self)
+        self.step_action.setShortcut(QKeySequence("Ctrl+N"))
+        self.step_action.triggered.connect(self.on_step_clicked)
+        self.step_action.setEnabled(False)
+        m.addAction(self.step_action)
+
+        speed_menu = m.addMenu("&Velocidad")
+        self.speed_group = QActionGroup(self)
+        self.speed_group.setExclusive(True)
+        for label, value in self.SPEEDS:
+            act = QAction(label, self, checkable=True)
+            act.setChecked(value == self.speed)
+            act.triggered.connect(lambda _=False, v=value: self.on_speed_selected(v))
+            self.speed_group.addAction(act)
+            speed_menu.addAction(act)
+
+        m.addSeparator()
+
+        self.record_action = QAction("&Grabar partida", self)
+        self.record_action.setShortcut(QKeySequence("Ctrl+G"))
+        self.record_action.setCheckable(True)
+        self.record_action.toggled.connect(self.on_record_toggled)
+        m.addAction(self.record_action)
+
         m.addSeparator()
 
         e = QAction("&Salir", self)
@@ -49,7 +83,10 @@ class GameMenuBar(QMenuBar):
 
     def on_start_clicked(self):
         log_msg("info", "menu.start_clicked")
-        self.start_requested.emit()
+        if self.is_running and self.is_paused:
+            self.resume_requested.emit()
+        else:
+            self.start_requested.emit()
         self._set_state(running=True, paused=False)
 
     def on_restart_clicked(self):
@@ -59,13 +96,40 @@ class GameMenuBar(QMenuBar):
 
     def on_pause_clicked(self):
         log_msg("info", "menu.pause_clicked")
-        self.pause_requested.emit()
+        if self.is_paused:
+            self.resume_requested.emit()
+            self._set_state(running=True, paused=False)
+        else:
+            self.pause_requested.emit()
+            self._set_state(running=True, paused=True)
+
+    def on_step_clicked(self):
+        log_msg("info", "menu.step_clicked")
+        self.step_requested.emit()
         self._set_state(running=True, paused=True)
 
+    def on_speed_selected(self, value: float):
+        log_msg("info", "menu.speed_selected", speed=value)
+        self.speed = value
+        self.speed_changed.emit(value)
+
+    def on_record_toggled(self, enabled: bool):
+        log_msg("info", "menu.record_toggled", enabled=enabled)
+        self.record_toggled.emit(enabled)
+
+    def set_recording(self, enabled: bool):
+        """Refleja el estado real de la grabación sin volver a emitir la señal."""
+        self.record_action.blockSignals(True)
+        self.record_action.setChecked(enabled)
+        self.record_action.blockSignals(False)
+
     def _set_state(self, running: bool, paused: bool):
         self.is_running, self.is_paused = running, paused
         self.start_action.setEnabled(not running or paused)
-        self.pause_action.setEnabled(running and not paused)
+        self.pause_action.setEnabled(running)
+        self.pause_action.setChecked(running and paused)
+        self.pause_action.setText("&Reanudar" if paused else "&Pausar")
+        self.step_action.setEnabled(running)
         self.start_action.setText("&Reanudar" if paused else "&Iniciar")
 
     def close_application(self):
@@ -1,7 +1,25 @@
 from PySide6.QtWidgets import QWidget, QLabel, QVBoxLayout
 from PySide6.QtCore import Qt, QSize
-from PySide6.QtGui import QPixmap, QImage
+from PySide6.QtGui import QPixmap, QImage, qRgb
+from typing import List, Optional
 import numpy as np
+from backend.utils.noise_map import INDEX_BLOCKED, INDEX_INTEREST, INDEX_LEVELS
+
+# Colores de las celdas especiales del mapa indexado
+_BLOCKED_RGB = (128, 32, 32)
+_INTEREST_RGB = {"item": (224, 176, 0), "shop": (48, 112, 224), "heal": (224, 80, 160)}
+
+
+def _build_color_table() -> List[int]:
+    # Más visitas = más oscuro, igual que en escala de grises
+    table = [qRgb(v, v, v) for v in
+             (255 - (i * 255) // (INDEX_LEVELS - 1) for i in range(INDEX_LEVELS))]
+    table += [qRgb(0, 0, 0)] * (256 - INDEX_LEVELS)
+    table[INDEX_BLOCKED] = qRgb(*_BLOCKED_RGB)
+    for kind, index in INDEX_INTEREST.items():
+        table[index] = qRgb(*_INTEREST_RGB[kind])
+    return table
+
 
 class NoisePanel(QWidget):
     def __init__(self, parent=None):
@@ -15,21 +33,40 @@ class NoisePanel(QWidget):
         lay = QVBoxLayout(self)
         lay.setContentsMargins(0, 0, 0, 0)
         lay.addWidget(self.label)
+        self._color_table = _build_color_table()
+        self.version: Optional[int] = None
+
+    def needs_update(self, version: int) -> bool:
+        return version != self.version
 
     def set_gray(self, gray: np.ndarray):
         if gray is None or gray.ndim != 2:
             return
-        img = np.ascontiguousarray(gray)
+        img = np.ascontiguousarray(gray, dtype=np.uint8)
         h, w = img.shape
-        rgb = np.repeat(img[:, :, None], 3, axis=2)
-        qimg = QImage(rgb.data.tobytes(), w, h, 3 * w, QImage.Format.Format_RGB888)
-        if qimg.isNull():
+        self._show(QImage(img.data, w, h, img.strides[0], QImage.Format.Format_Grayscale8))
+
+    def set_indexed(self, codes: np.ndarray, version: Optional[int] = None):
+        """Pinta los códigos de NoiseVisitMap.to_indexed_u8 con la tabla de colores."""
+        if codes is None or codes.ndim != 2:
             return
+        img = np.ascontiguousarray(codes, dtype=np.uint8)
+        h, w = img.shape
+        qimg = QImage(img.data, w, h, img.strides[0], QImage.Format.Format_Indexed8)
+        qimg.setColorTable(self._color_table)
+        if self._show(qimg):
+            self.version = version
+
+    def _show(self, qimg: QImage) -> bool:
+        if qimg.isNull():
+            return False
+        # Celdas nítidas: un mapa de 15x20 no gana nada con el suavizado
         pm = QPixmap.fromImage(qimg).scaled(
             QSize(300, 300),
             Qt.AspectRatioMode.KeepAspectRatio,
-            Qt.TransformationMode.SmoothTransformation
+            Qt.TransformationMode.FastTransformation
         )
         self.label.setPixmap(pm)
         if self.label.text():
-            self.label.setText("")
\ No newline at end of file
+            self.label.setText("")
+        return True
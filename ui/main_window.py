@@ -7,7 +7,7 @@ from config.logger_core import log_msg
 from ui.components.game_display import GameDisplay
 from ui.components.menu_bar import GameMenuBar
 from ui.components.noise_panel import NoisePanel
-from backend.emulator import run_pyboy_threaded, last_explorer
+from backend.emulator import run_pyboy_threaded
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -47,6 +47,10 @@ class MainWindow(QMainWindow):
         self.menu.start_requested.connect(self.start_emulator)
         self.menu.restart_requested.connect(self.restart_emulator)
         self.menu.pause_requested.connect(self.pause_emulator)
+        self.menu.resume_requested.connect(self.resume_emulator)
+        self.menu.step_requested.connect(self.step_emulator)
+        self.menu.speed_changed.connect(self.set_emulation_speed)
+        self.menu.record_toggled.connect(self.set_recording)
 
     def _init_timer(self):
         self.status_timer = QTimer(self)
@@ -61,7 +65,11 @@ class MainWindow(QMainWindow):
         log_msg("info", "ui.start_emulator")
         self.pyboy, self.emulator_thread = run_pyboy_threaded()
         if self.pyboy and self.emulator_thread:
-            self.display.connect_emulator(self.pyboy)
+            if hasattr(self.emulator_thread, "set_speed") and not self.emulator_thread.cfg.turbo:
+                self.emulator_thread.set_speed(self.menu.speed)
+            if self.menu.record_action.isChecked():
+                self.set_recording(True)
+            self.display.connect_emulator(self.pyboy, getattr(self.emulator_thread, "frame_ring", None))
             self.running = True
             self.status.showMessage("Simulación iniciada")
         else:
@@ -69,17 +77,62 @@ class MainWindow(QMainWindow):
 
     def restart_emulator(self):
         log_msg("info", "ui.restart_emulator")
+        thread = self.emulator_thread
+        if thread is not None and hasattr(thread, "restart") and thread.restart():
+            if hasattr(thread, "resume"):
+                thread.resume()
+            self.running = True
+            self.status.showMessage("Simulación reiniciada")
+            return
         self.stop_emulator()
         self.start_emulator()
 
     def pause_emulator(self):
         log_msg("info", "ui.pause_emulator")
+        if self.emulator_thread is not None and hasattr(self.emulator_thread, "pause"):
+            self.emulator_thread.pause()
         self.status.showMessage("Simulación pausada")
 
+    def resume_emulator(self):
+        log_msg("info", "ui.resume_emulator")
+        if self.emulator_thread is not None and hasattr(self.emulator_thread, "resume"):
+            self.emulator_thread.resume()
+        self.status.showMessage("Simulación reanudada")
+
+    def step_emulator(self):
+        log_msg("info", "ui.step_emulator")
+        if self.emulator_thread is not None and hasattr(self.emulator_thread, "step_once"):
+            self.emulator_thread.step_once()
+        self.status.showMessage("Simulación pausada - paso a paso")
+
+    def set_emulation_speed(self, speed: float):
+        if self.emulator_thread is not None and hasattr(self.emulator_thread, "set_speed"):
+            self.emulator_thread.set_speed(speed)
+
+    def set_recording(self, enabled: bool):
+        thread = self.emulator_thread
+        if thread is None or not hasattr(thread, "start_recording"):
+            return
+        if enabled and not thread.recording:
+            try:
+                rec = thread.start_recording()
+            except OSError as e:
+                log_msg("error", "recorder.write_error", path="recordings", error=str(e))
+                self.menu.set_recording(False)
+                return
+            log_msg("info", "ui.recording_started", path=rec.path)
+            self.status.showMessage(f"Grabando en {rec.path}")
+        elif not enabled and thread.recording:
+            thread.stop_recording()
+            log_msg("info", "ui.recording_stopped")
+            self.status.showMessage("Grabación detenida")
+
     def stop_emulator(self):
         if getattr(self.display, "capture_thread", None):
             self.display.disconnect_emulator()
         if self.emulator_thread and self.emulator_thread.is_alive():
+            if hasattr(self.emulator_thread, "stop"):
+                self.emulator_thread.stop()
             self.emulator_thread.join(2)
         self.running = False
         self.pyboy = None
@@ -92,27 +145,54 @@ class MainWindow(QMainWindow):
     def _update_status(self):
         if self.running:
             stats = self.display.get_display_stats()
-            fps = stats.get("current_fps", 0.0)
-            buf = stats.get("buffer_size", 0)
-
-            explorer = last_explorer
+            msg = (f"FPS emu/entregados/pantalla: {stats.get('produced_fps', 0.0):.1f}"
+                   f"/{stats.get('delivered_fps', 0.0):.1f}/{stats.get('displayed_fps', 0.0):.1f}"
+                   f" | Saltados: {stats.get('skipped_frames', 0)}"
+                   f" | Perdidos: {stats.get('dropped_frames', 0)}")
+            explorer = self._current_explorer()
             if explorer and hasattr(explorer, "get_stats"):
                 explorer_stats = explorer.get_stats()
                 visited = explorer_stats.get("visited_positions", 0)
-                self.status.showMessage(f"FPS: {fps:.1f} | Buffer: {buf} | Visitadas: {visited}")
-            else:
-                self.status.showMessage(f"FPS: {fps:.1f} | Buffer: {buf}")
+                msg += f" | Visitadas: {visited}"
+            if getattr(self.emulator_thread, "paused", False):
+                msg = "En pausa | " + msg
+            if self.emulator_thread is not None and hasattr(self.emulator_thread, "get_profile_stats"):
+                profile = self._format_profile(self.emulator_thread.get_profile_stats())
+                if profile:
+                    msg += f" | {profile}"
+            self.status.showMessage(msg)
+
+    @staticmethod
+    def _format_profile(stats: dict) -> str:
+        loop = stats.get("loop")
+        if not loop:
+            return ""
+        parts = [f"Paso: {loop['ewma_us']:.0f}µs"]
+        for phase, label in (("tick", "tick"), ("context", "ctx"), ("agent.explorer", "explorer"),
+                             ("agent.combat", "combate"), ("input", "input"),
+                             ("publish", "frame"), ("logging", "log")):
+            st = stats.get(phase)
+            if st and st["share"] > 0:
+                parts.append(f"{label} {st['share'] * 100:.0f}%")
+        return " ".join(parts)
+
+    def _current_explorer(self):
+        # El explorador del episodio en curso; también cambia tras restart()
+        return getattr(self.emulator_thread, "explorer", None)
 
     def _update_noise_panel(self):
         if not self.running:
             return
 
-        explorer = last_explorer
-        if explorer and hasattr(explorer, "get_noise_grayscale"):
+        explorer = self._current_explorer()
+        if explorer and hasattr(explorer, "get_noise_indexed"):
             try:
-                gray = explorer.get_noise_grayscale()
-                if gray is not None and gray.size > 0:
-                    self.noise_panel.set_gray(gray)
+                version = explorer.noise_version
+                if not self.noise_panel.needs_update(version):
+                    return
+                codes = explorer.get_noise_indexed()
+                if codes is not None and codes.size > 0:
+                    self.noise_panel.set_indexed(codes, version)
             except Exception as e:
                 if hasattr(self, '_noise_error_count'):
                     self._noise_error_count += 1
@@ -0,0 +1,57 @@
+import time
+import threading
+
+
+class RateMeter:
+    """
+    Tasa de eventos por segundo suavizada con EWMA.
+
+    Los eventos se acumulan en ventanas de `window` segundos; al cerrar cada
+    ventana su tasa se mezcla con la anterior usando `alpha`. Si no llegan
+    eventos la tasa decae hacia cero al consultarla.
+    """
+
+    def __init__(self, window: float = 0.5, alpha: float = 0.3):
+        self.window = window
+        self.alpha = alpha
+        self.total = 0
+        self._rate = 0.0
+        self._primed = False
+        self._count = 0
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def tick(self, n: int = 1) -> None:
+        with self._lock:
+            self._count += n
+            self.total += n
+            self._roll(time.perf_counter())
+
+    def set_total(self, total: int) -> None:
+        """Registra los eventos de un contador monótono externo (p. ej. FrameRing.seq)."""
+        if total > self.total:
+            self.tick(total - self.total)
+
+    def _roll(self, now: float) -> None:
+        elapsed = now - self._start
+        if elapsed < self.window:
+            return
+        inst = self._count / elapsed
+        self._rate = self._rate + self.alpha * (inst - self._rate) if self._primed else inst
+        self._primed = True
+        self._count = 0
+        self._start = now
+
+    @property
+    def rate(self) -> float:
+        with self._lock:
+            self._roll(time.perf_counter())
+            return self._rate
+
+    def reset(self) -> None:
+        with self._lock:
+            self.total = 0
+            self._rate = 0.0
+            self._primed = False
+            self._count = 0
+            self._start = time.perf_counter()
@@ -1,59 +1,164 @@
 import time
 import threading
-from collections import deque
-from typing import Optional
+from typing import List, Optional
 import numpy as np
+from backend.utils.frame_ring import FrameRing
+from ui.utils.fps_meter import RateMeter
 from config.logger_core import log_msg
 
+_SLOTS = 3
+# Margen sobre 1/target_fps: el QTimer de 33 ms oscila y sin él se salta uno de cada dos
+_GATE_TOLERANCE = 0.9
 
-class FrameBuffer:    
-    def __init__(self, target_fps: int = 30, buffer_size: int = 90):
+
+class FrameBuffer:
+    """
+    Último frame disponible para la interfaz, en triple buffer.
+
+    `add_frame` copia en el slot trasero y lo intercambia con el listo;
+    `get_current_frame` toma el listo como frontal solo si hay uno nuevo.
+    Solo existen tres frames en memoria. Con `attach_ring` los frames se
+    leen del FrameRing del emulador, que ya hace ese papel.
+
+    Se miden tres tasas: producidos (frames escritos por el emulador),
+    entregados (avisos de frame nuevo recibidos por la interfaz) y mostrados
+    (pixmaps puestos en pantalla). `skipped_frames` cuenta frames producidos
+    que nunca llegaron a mostrarse porque llegó otro antes; `dropped_frames`,
+    frames descartados por estar sobrescritos al terminar de convertirlos.
+    """
+
+    def __init__(self, target_fps: int = 30):
         self.target_fps = target_fps
         self.frame_time = 1.0 / target_fps
-        self.buffer_size = buffer_size
-        
-        self.frame_buffer = deque(maxlen=buffer_size)
+
+        self._slots: Optional[List[np.ndarray]] = None
+        self._slot_seq = [0] * _SLOTS
+        self._back, self._ready, self._front = 0, 1, 2
+        self._fresh = False
+        self._pushed = 0
+
         self.current_frame: Optional[np.ndarray] = None
+        self.current_seq = 0
+        self.ring: Optional[FrameRing] = None
         self.last_frame_time = time.time()
         self.frame_count = 0
-        
+
+        self.produced = RateMeter()
+        self.delivered = RateMeter()
+        self.displayed = RateMeter()
+        self.skipped_frames = 0
+        self.dropped_frames = 0
+        self._last_displayed_seq = 0
+
         self._lock = threading.Lock()
-        self._running = False
-        self._buffer_thread = None
-        
+
+    def attach_ring(self, ring: Optional[FrameRing]) -> None:
+        """
+        Lee los frames del FrameRing compartido en lugar del triple buffer
+        propio; `get_current_frame` devuelve entonces una vista del slot.
+        """
+        with self._lock:
+            self.ring = ring
+        self.clear()
+        if ring is not None:
+            # Los frames publicados antes de conectar no cuentan como producidos
+            self.produced.total = ring.seq
+
+    def is_current_valid(self) -> bool:
+        """False si el productor ya sobrescribió el slot del frame actual."""
+        return self.ring is None or self.ring.is_current(self.current_seq)
+
+    def _ensure_slots(self, frame: np.ndarray) -> None:
+        slots = self._slots
+        if slots is None or slots[0].shape != frame.shape or slots[0].dtype != frame.dtype:
+            self._slots = [np.empty_like(frame) for _ in range(_SLOTS)]
+            self._slot_seq = [0] * _SLOTS
+            self._fresh = False
+
     def add_frame(self, frame: np.ndarray) -> None:
+        if self.ring is not None:
+            self.ring.publish(frame)
+            return
         with self._lock:
-            frame_copy = frame.copy()
-            self.frame_buffer.append({
-                'frame': frame_copy,
-                'timestamp': time.time()
-            })
-            
+            self._ensure_slots(frame)
+            back = self._back
+        # El slot trasero solo lo toca el productor: la copia va fuera del lock
+        np.copyto(self._slots[back], frame)
+        with self._lock:
+            self._pushed += 1
+            self._slot_seq[back] = self._pushed
+            self._back, self._ready = self._ready, back
+            self._fresh = True
+        self.produced.tick()
+
+    def mark_delivered(self, n: int = 1) -> None:
+        self.delivered.tick(n)
+
+    def mark_displayed(self) -> None:
+        seq = self.current_seq
+        if self._last_displayed_seq and seq > self._last_displayed_seq + 1:
+            self.skipped_frames += seq - self._last_displayed_seq - 1
+        self._last_displayed_seq = seq
+        self.displayed.tick()
+
+    def mark_dropped(self) -> None:
+        self.dropped_frames += 1
+
     def get_current_frame(self) -> Optional[np.ndarray]:
         current_time = time.time()
-        
-        if current_time - self.last_frame_time >= self.frame_time:
+
+        if current_time - self.last_frame_time >= self.frame_time * _GATE_TOLERANCE:
+            ring = self.ring
+            if ring is not None:
+                seq, frame = ring.latest()
+                self.produced.set_total(seq)
+                if frame is not None and seq != self.current_seq:
+                    self.current_frame = frame
+                    self.current_seq = seq
+                    self.last_frame_time = current_time
+                    self.frame_count += 1
+                return self.current_frame
             with self._lock:
-                if self.frame_buffer:
-                    latest_frame_data = self.frame_buffer[-1]
-                    self.current_frame = latest_frame_data['frame']
+                if self._fresh:
+                    self._front, self._ready = self._ready, self._front
+                    self._fresh = False
+                    self.current_frame = self._slots[self._front]
+                    self.current_seq = self._slot_seq[self._front]
                     self.last_frame_time = current_time
                     self.frame_count += 1
-                    
+
         return self.current_frame
-    
+
     def get_fps_stats(self) -> dict:
-        with self._lock:
-            return {
-                'buffer_size': len(self.frame_buffer),
-                'target_fps': self.target_fps,
-                'frame_count': self.frame_count,
-                'current_fps': self.frame_count / max(time.time() - self.last_frame_time, 1)
-            }
-    
+        if self.ring is not None:
+            self.produced.set_total(self.ring.seq)
+        displayed_fps = self.displayed.rate
+        return {
+            'buffer_size': self.ring.slots if self.ring is not None else _SLOTS,
+            'target_fps': self.target_fps,
+            'frame_count': self.frame_count,
+            'current_fps': displayed_fps,
+            'produced_fps': self.produced.rate,
+            'delivered_fps': self.delivered.rate,
+            'displayed_fps': displayed_fps,
+            'produced_frames': self.produced.total,
+            'displayed_frames': self.displayed.total,
+            'skipped_frames': self.skipped_frames,
+            'dropped_frames': self.dropped_frames,
+        }
+
     def clear(self) -> None:
         with self._lock:
-            self.frame_buffer.clear()
+            self._slots = None
+            self._slot_seq = [0] * _SLOTS
+            self._fresh = False
+            self._pushed = 0
             self.current_frame = None
+            self.current_seq = 0
             self.frame_count = 0
-            self.last_frame_time = time.time()
\ No newline at end of file
+            self.last_frame_time = time.time()
+        for meter in (self.produced, self.delivered, self.displayed):
+            meter.reset()
+        self.skipped_frames = 0
+        self.dropped_frames = 0
+        self._last_displayed_seq = 0